@@ -28,6 +28,7 @@ class Credentials(object):
         self._password = password
         self._auth_file = auth_file
         self._token = token
+        self._auth_header = None
 
         # If (username and password) or token is provided, then don't read auth_file (default or user provided)
         if (self._username and self._password) or (self._token):
@@ -90,11 +91,16 @@ class Credentials(object):
     @token.setter
     def token(self, token: str):
         self._token = token
+        # The cached header was built from the previous token
+        self._auth_header = None
 
     def get_auth_header(self) -> dict:
         if not self.token:
             raise Exception('Token is not set.')
-        return dict(Authorization=f'token {self.token}')
+        # Build the header once per token, and return a copy so callers can add their own headers to it
+        if self._auth_header is None:
+            self._auth_header = dict(Authorization=f'token {self.token}')
+        return dict(self._auth_header)
 
     def as_dict(self) -> dict:
         """
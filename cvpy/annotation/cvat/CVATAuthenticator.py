@@ -17,6 +17,9 @@ class CVATAuthenticator(object):
     # Max attempts for the user to provide valid URL, username and password before exiting
     MAX_ATTEMPTS = 3
 
+    # Seconds to wait for the CVAT server to answer a login request
+    LOGIN_TIMEOUT = 30
+
     @staticmethod
     def generate_cvat_token():
         """
@@ -104,7 +107,8 @@ class CVATAuthenticator(object):
 
         # Authenticates against the CVAT server
         response = requests.post(f'{url}/api/auth/login',
-                                 data=dict(username=credentials.username, password=credentials.password))
+                                 data=dict(username=credentials.username, password=credentials.password),
+                                 timeout=CVATAuthenticator.LOGIN_TIMEOUT)
 
         success = True
         message = None
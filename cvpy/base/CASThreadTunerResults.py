@@ -37,6 +37,10 @@ class CASThreadTunerResults(object):
         Specifies the maximum of recorded execution times over specified iterations.
     stdev_exec_times: 
         Specifies the standard deviation of recorded execution times over specified iterations.
+    iteration_counts:
+        Specifies the number of iterations that were run for each combination of threads.
+
+    The execution times of thread combinations that were not evaluated by the search strategy are NaN.
     
     '''
 
@@ -50,7 +54,8 @@ class CASThreadTunerResults(object):
                  median_exec_times: List[List[int]] = None,
                  minimum_exec_times: List[List[int]] = None,
                  maximum_exec_times: List[List[int]] = None,
-                 stdev_exec_times: List[List[int]] = None):
+                 stdev_exec_times: List[List[int]] = None,
+                 iteration_counts: List[List[int]] = None):
 
         ''' Constructs the CASThreadTunerResults class '''
 
@@ -65,6 +70,7 @@ class CASThreadTunerResults(object):
         self._minimum_exec_times = minimum_exec_times
         self._maximum_exec_times = maximum_exec_times
         self._stdev_exec_times = stdev_exec_times
+        self._iteration_counts = iteration_counts
 
     @property
     def cas_server_mode(self) -> CASServerMode:
@@ -154,6 +160,14 @@ class CASThreadTunerResults(object):
     def stdev_exec_times(self, stdev_exec_times) -> None:
         self._sd_exec_times = stdev_exec_times
 
+    @property
+    def iteration_counts(self) -> List[List[int]]:
+        return self._iteration_counts
+
+    @iteration_counts.setter
+    def iteration_counts(self, iteration_counts) -> None:
+        self._iteration_counts = iteration_counts
+
     def plot_exec_times(self, fig_width: float = 8, fig_height: float = 8) -> Figure:
         '''
         Plot performance for given CAS thread tuner results.
@@ -184,8 +198,10 @@ class CASThreadTunerResults(object):
         if self.cas_server_mode == CASServerMode.SMP:
             # Line plot
             fig = plt.figure(figsize=(fig_width, fig_height))
-            x = list(self.controller_thread_range)
-            y = opt_array
+            # Only plot the evaluated thread counts
+            evaluated = ~np.isnan(opt_array)
+            x = np.asarray(self.controller_thread_range)[evaluated]
+            y = np.asarray(opt_array)[evaluated]
             plt.xlabel('Controller Thread Count')
             plt.ylabel('Runtime (sec)')
             plt.title('Performance of loadImages in SMP')
@@ -198,7 +214,13 @@ class CASThreadTunerResults(object):
             fig.set_figheight(fig_height)
             fig.set_figwidth(fig_width)
             x, y = np.meshgrid(self.controller_thread_range, self.worker_thread_range)
-            surf = ax.plot_surface(x, y, np.transpose(opt_array), cmap=cm.coolwarm, linewidth=0, antialiased=False)
+            z = np.transpose(opt_array)
+            if np.isnan(z).any():
+                # Scatter plot of the evaluated thread combinations, a surface needs the full grid
+                evaluated = ~np.isnan(z)
+                surf = ax.scatter(x[evaluated], y[evaluated], z[evaluated], c=z[evaluated], cmap=cm.coolwarm)
+            else:
+                surf = ax.plot_surface(x, y, z, cmap=cm.coolwarm, linewidth=0, antialiased=False)
             fig.colorbar(surf, shrink=0.5, aspect=5)
             ax.set_xlabel('Controller Thread Count')
             ax.set_ylabel('Worker Thread Count')
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class SearchStrategy(Enum):
+    GRID = 0
+    PATTERN = 1
+    LATIN_HYPERCUBE = 2
@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+# encoding: utf-8
+#
+# Copyright SAS Institute
+#
+#  Licensed under the Apache License, Version 2.0 (the License);
+#  you may not use this file except in compliance with the License.
+#  You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+#  Unless required by applicable law or agreed to in writing, software
+#  distributed under the License is distributed on an "AS IS" BASIS,
+#  WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#  See the License for the specific language governing permissions and
+#  limitations under the License.
+#
+
+'''
+Sets the test class attributes from the CVPY_* environment variables below, and marks the test classes that need a
+live CAS or CVAT server as integration tests. The JUnit XML report is written to the path in CVPY_JUNITXML, if set.
+Plots are drawn with the Agg backend unless MPLBACKEND is set.
+'''
+
+import os
+
+import pytest
+
+# Draw the plots of the tests without a display. matplotlib reads this when pyplot is first imported.
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+# Environment variable for each setting, keyed by the upper case name of the test class attribute
+ENVIRONMENT_VARIABLES = {
+    'CAS_HOST': 'CVPY_CAS_HOST',
+    'CAS_PORT': 'CVPY_CAS_PORT',
+    'CAS_PROTOCOL': 'CVPY_CAS_PROTOCOL',
+    'PROTOCOL': 'CVPY_CAS_PROTOCOL',
+    'CAS_USERNAME': 'CVPY_CAS_USERNAME',
+    'USERNAME': 'CVPY_CAS_USERNAME',
+    'CAS_PASSWORD': 'CVPY_CAS_PASSWORD',
+    'PASSWORD': 'CVPY_CAS_PASSWORD',
+    'DATAPATH': 'CVPY_DATAPATH',
+    'LOCALPATH': 'CVPY_LOCALPATH',
+    'CVAT_URL': 'CVPY_CVAT_URL',
+    'CVAT_USERNAME': 'CVPY_CVAT_USERNAME',
+    'CVAT_PASSWORD': 'CVPY_CVAT_PASSWORD',
+    'AUTH_FILE_WITH_TOKEN': 'CVPY_AUTH_FILE_WITH_TOKEN',
+    'AUTH_FILE_WITH_USERNAME_PASSWORD': 'CVPY_AUTH_FILE_WITH_USERNAME_PASSWORD',
+}
+
+# Settings that only the test classes needing a live server declare, keyed by their upper case name
+SERVER_SETTINGS = ('CAS_HOST', 'CVAT_URL')
+
+
+def pytest_configure(config):
+    # Write one JUnit XML report for the whole run when its path is given in the environment
+    junit_xml_path = os.environ.get('CVPY_JUNITXML')
+    if junit_xml_path and config.pluginmanager.hasplugin('junitxml') and not config.option.xmlpath:
+        config.option.xmlpath = junit_xml_path
+
+
+def pytest_collection_modifyitems(session, config, items):
+    # Set the class attributes of every collected test class from the environment, once per class
+    test_classes = {item.cls for item in items if item.cls is not None}
+    integration_classes = set()
+    for test_class in test_classes:
+        for name in vars(test_class):
+            if name.upper() in SERVER_SETTINGS:
+                integration_classes.add(test_class)
+            variable = ENVIRONMENT_VARIABLES.get(name.upper())
+            if variable is not None and variable in os.environ:
+                setattr(test_class, name, os.environ[variable])
+
+    # Mark the tests of the classes that need a live server
+    for item in items:
+        if item.cls in integration_classes:
+            item.add_marker(pytest.mark.integration)
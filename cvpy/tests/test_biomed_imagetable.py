@@ -20,7 +20,6 @@ import sys
 import unittest
 
 import numpy as np
-import xmlrunner
 from swat import CAS
 
 from cvpy.base.ImageTable import ImageTable
@@ -28,23 +27,45 @@ from cvpy.base.ImageType import ImageType
 from cvpy.biomedimage.LabelConnectivity import LabelConnectivity
 
 
+# Pixels of the biomedimg/simple.png test image, read-only so that no test changes them
+SIMPLE_IMAGE_ARRAY = np.array([[0, 0, 0, 0, 0], [0, 255, 0, 0, 0], [0, 255, 0, 150, 0], [0, 0, 0, 0, 50], [0, 0, 0, 0, 0]])
+SIMPLE_IMAGE_ARRAY.setflags(write=False)
+
+
 class TestBiomedImage(unittest.TestCase):
     CAS_HOST = None
     CAS_PORT = None
     USERNAME = None
     PASSWORD = None
+    CAS_PROTOCOL = None
     DATAPATH = None
 
-    def setUp(self) -> None:
+    @classmethod
+    def setUpClass(cls) -> None:
         # Set up CAS connection
-        self.s = CAS(TestBiomedImage.CAS_HOST, TestBiomedImage.CAS_PORT, TestBiomedImage.USERNAME,
-                     TestBiomedImage.PASSWORD, protocol=TestBiomedImage.CAS_PROTOCOL)
-        self.s.loadactionset("image")
-        self.s.addcaslib(name='dlib', activeOnAdd=False, path=TestBiomedImage.DATAPATH, dataSource='PATH',
-                         subdirectories=True)
-
-    def tearDown(self) -> None:
-        self.s.close()
+        cls.s = CAS(TestBiomedImage.CAS_HOST, TestBiomedImage.CAS_PORT, TestBiomedImage.USERNAME,
+                    TestBiomedImage.PASSWORD, protocol=TestBiomedImage.CAS_PROTOCOL)
+        cls.s.loadactionset("image")
+        cls.s.loadactionset("biomedimage")
+        cls.s.addcaslib(name='dlib', activeOnAdd=False, path=TestBiomedImage.DATAPATH, dataSource='PATH',
+                        subdirectories=True)
+
+        # Load the NIfTI images shared by several tests once, instead of reading them from disk in every test.
+        # None of the tests modify these tables.
+        cls.simple_gray = cls.s.CASTable('simple_gray', replace=True)
+        cls.s.image.loadimages(path='TestMasking/simpleGray.nii', casout=cls.simple_gray, caslib='dlib')
+
+        cls.prostate = cls.s.CASTable('prostate', replace=True)
+        cls.s.image.loadimages(path='biomedimg/Prostate3T-01-0001.nii', casout=cls.prostate, caslib='dlib',
+                               decode=True)
+
+        # Wrap the shared tables once; from_table queries the server to detect the image type
+        cls.simple_gray_image_table = ImageTable.from_table(cls.simple_gray)
+        cls.prostate_image_table = ImageTable.from_table(cls.prostate)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.s.close()
 
     def test_fetch_image_array(self):
         # Load the image
@@ -56,8 +77,7 @@ class TestBiomedImage(unittest.TestCase):
 
         image_array = image.fetch_image_array()
 
-        self.assertTrue(np.array_equal(image_array, np.array(
-            [[0, 0, 0, 0, 0], [0, 255, 0, 0, 0], [0, 255, 0, 150, 0], [0, 0, 0, 0, 50], [0, 0, 0, 0, 0]])))
+        self.assertTrue(np.array_equal(image_array, SIMPLE_IMAGE_ARRAY))
 
     def test_fetch_geometry_info_no_geometry(self):
         # Load the image
@@ -82,12 +102,11 @@ class TestBiomedImage(unittest.TestCase):
     # and FACE for label connectivity.
     def test_quantify_sphericity_from_casTable(self):
         # Load the input image
-        input = ImageTable.load(self.s, path='biomedimg/Prostate3T-01-0001.nii',
-                                load_parms={'caslib': 'dlib', 'decode': True})
+        input = self.prostate_image_table
 
         # Compute the sphericity
         output = input.sphericity(use_spacing=True, input_background=0, label_connectivity=LabelConnectivity.FACE,
-                                  output_table_parms={'replace': True})
+                                  output_table_parms={'name': self._testMethodName, 'replace': True})
 
         image_rows = output.fetch()['Fetch']
 
@@ -98,12 +117,11 @@ class TestBiomedImage(unittest.TestCase):
     # Load a biomed image and quantify sphericity using custom input background of -20.
     def test_quantify_sphericity_from_casTable_custom_input_background(self):
         # Load the input image
-        input = ImageTable.load(self.s, path='biomedimg/Prostate3T-01-0001.nii',
-                                load_parms={'caslib': 'dlib', 'decode': True})
+        input = self.prostate_image_table
 
         # Compute the sphericity
         output = input.sphericity(use_spacing=True, input_background=20, label_connectivity=LabelConnectivity.FACE,
-                                  output_table_parms={'replace': True})
+                                  output_table_parms={'name': self._testMethodName, 'replace': True})
 
         image_rows = output.fetch()['Fetch']
 
@@ -113,10 +131,10 @@ class TestBiomedImage(unittest.TestCase):
 
     def test_morphological_gradient_3d_grayscale_image(self):
         # Load the input image
-        input = ImageTable.load(self.s, path='TestMasking/simpleGray.nii', load_parms={'caslib': 'dlib'})
+        input = self.simple_gray_image_table
 
         # Compute Morphological Gradient
-        output = input.morphological_gradient(output_table_parms={'replace': True})
+        output = input.morphological_gradient(output_table_parms={'name': self._testMethodName, 'replace': True})
 
         # Correct Image Array
         test_arr = np.array([[176, 57, 0, 104, 192],
@@ -126,7 +144,7 @@ class TestBiomedImage(unittest.TestCase):
                              [127, 131, 0, 0, 0]])
 
         # Export the biomedical image
-        export_image = self.s.CASTable('export_image')
+        export_image = self.s.CASTable(f'{self._testMethodName}_export', replace=True)
         self.s.biomedimage.processbiomedimages(
             images=dict(table={'name': output.table.to_table_name()}),
             steps=[
@@ -137,7 +155,7 @@ class TestBiomedImage(unittest.TestCase):
         )
 
         # Create an array from the exported image
-        export_img_arr = np.asarray(self.s.image.fetchImages(table='export_image').Images.Image[0])
+        export_img_arr = np.asarray(self.s.image.fetchImages(table=export_image).Images.Image[0])
 
         # Compare the arrays
         return np.array_equal(export_img_arr, test_arr)
@@ -155,41 +173,43 @@ class TestBiomedImage(unittest.TestCase):
 
     def test_morphological_gradient_invalid_parameters(self):
         # Load the input image
-        input = ImageTable.load(self.s, path='TestMasking/simpleGray.nii', load_parms={'caslib': 'dlib'})
+        input = self.simple_gray_image_table
 
         # Compute Morphological Gradient
         output = input.morphological_gradient(kernel_width=11,
                                               kernel_height=13, copy_vars=['invalid', '_id_'],
-                                              output_table_parms={'replace': True})
+                                              output_table_parms={'name': self._testMethodName, 'replace': True})
 
         # Assert the output
         self.assertTrue(output.table)
 
     def test_morphological_gradient_duplicate_copyvars(self):
         # Load the input image
-        input = ImageTable.load(self.s, path='TestMasking/simpleGray.nii', load_parms={'caslib': 'dlib'})
+        input = self.simple_gray_image_table
 
         # Compute Morphological Gradient
         output = input.morphological_gradient(kernel_width=11, kernel_height=13,
                                               copy_vars=['_biomedid_', '_biomeddimension_', '_sliceindex_'],
-                                              output_table_parms={'replace': True})
+                                              output_table_parms={'name': self._testMethodName, 'replace': True})
 
         # Assert the output
         self.assertTrue(output.table)
 
     def test_morphological_gradient_valid_copyvars(self):
         # Load the input image
-        input = ImageTable.load(self.s, path='TestMasking/simpleGray.nii', load_parms={'caslib': 'dlib'})
+        input = self.simple_gray_image_table
 
         # Compute Morphological Gradient
         output = input.morphological_gradient(copy_vars=['_id_', '_path_'],
-                                              output_table_parms={'replace': True})
+                                              output_table_parms={'name': self._testMethodName, 'replace': True})
 
         # Assert the output
         self.assertTrue(output.table)
 
 
 if __name__ == '__main__':
+    import xmlrunner
+
     if len(sys.argv) > 1:
         TestBiomedImage.DATAPATH = sys.argv.pop()
         TestBiomedImage.PASSWORD = sys.argv.pop()
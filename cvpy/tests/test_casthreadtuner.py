@@ -18,16 +18,22 @@
 
 import sys
 import unittest
+from unittest.mock import Mock
 
+import matplotlib
+import matplotlib.pyplot as plt
 import numpy as np
-import xmlrunner
-
+import pandas as pd
 from swat import CAS
 
 from cvpy.base.CASServerMode import CASServerMode
+from cvpy.base.SearchStrategy import SearchStrategy
 from cvpy.base.Statistic import Statistic
 from cvpy.utils.CASThreadTuner import CASThreadTuner
 
+# Settings of the plots drawn by the tests, the bundled font needs no font fallback search
+PLOT_RC_PARAMS = {'font.family': 'DejaVu Sans'}
+
 
 class TestCASThreadTuner(unittest.TestCase):
     CAS_HOST = None
@@ -36,24 +42,39 @@ class TestCASThreadTuner(unittest.TestCase):
     PASSWORD = None
     DATAPATH = None
 
+    # Session shared by the tuner runs of all tests
+    session = None
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        if cls.session is not None:
+            cls.session.close()
+            cls.session = None
+
     @staticmethod
     def set_up() -> CAS:
-        s = CAS(TestCASThreadTuner.CAS_HOST, TestCASThreadTuner.CAS_PORT, TestCASThreadTuner.USERNAME,
-                TestCASThreadTuner.PASSWORD)
+        # Connect and set up the session only once, later tuner runs reuse it. As every call returns the same
+        # session, this must not be used with max_workers greater than 1.
+        if TestCASThreadTuner.session is None:
+            s = CAS(TestCASThreadTuner.CAS_HOST, TestCASThreadTuner.CAS_PORT, TestCASThreadTuner.USERNAME,
+                    TestCASThreadTuner.PASSWORD)
 
-        s.loadactionset('image')
+            s.loadactionset('image')
 
-        s.addcaslib(name='dlib',
-                    activeOnAdd=False,
-                    path=TestCASThreadTuner.DATAPATH,
-                    datasource='PATH',
-                    subdirectories=True)
+            s.addcaslib(name='dlib',
+                        activeOnAdd=False,
+                        path=TestCASThreadTuner.DATAPATH,
+                        datasource='PATH',
+                        subdirectories=True)
 
-        return s
+            TestCASThreadTuner.session = s
+
+        return TestCASThreadTuner.session
 
     @staticmethod
     def tear_down(s) -> None:
-        s.close()
+        # The shared session is closed in tearDownClass
+        pass
 
     @staticmethod
     def load_images(s: CAS, c_threads: np.ndarray, w_threads: np.ndarray) -> float:
@@ -74,7 +95,8 @@ class TestCASThreadTuner(unittest.TestCase):
                                                          teardown_function=TestCASThreadTuner.tear_down,
                                                          iterations=2, controller_thread_range=range(16, 65, 16),
                                                          worker_thread_range=range(32, 65, 32),
-                                                         objective_measure=Statistic.MEDIAN)
+                                                         objective_measure=Statistic.MEDIAN,
+                                                         search_strategy=SearchStrategy.PATTERN)
 
         self.assertTrue(tuner_results._cas_server_mode == CASServerMode.SMP or
                         tuner_results._cas_server_mode == CASServerMode.MPP)
@@ -91,8 +113,10 @@ class TestCASThreadTuner(unittest.TestCase):
             self.assertEqual(tuner_results._worker_thread_range, range(32, 65, 32))
             self.assertIsNotNone(tuner_results._worker_optimal_thread_count)
 
-        fig = tuner_results.plot_exec_times(fig_width=5, fig_height=5)
+        with matplotlib.rc_context(PLOT_RC_PARAMS):
+            fig = tuner_results.plot_exec_times(fig_width=5, fig_height=5)
         self.assertIsNotNone(fig)
+        plt.close(fig)
 
     def test_casthreadtuner_optional_parameters_not_specified(self):
 
@@ -110,15 +134,156 @@ class TestCASThreadTuner(unittest.TestCase):
         self.assertIsNotNone(tuner_results._maximum_exec_times)
         self.assertIsNotNone(tuner_results._stdev_exec_times)
 
+        # The default grid search evaluates every combination of threads with 5 iterations
+        self.assertFalse(np.isnan(tuner_results.mean_exec_times).any())
+        self.assertTrue(np.all(tuner_results.iteration_counts == 5))
+
         if tuner_results._cas_server_mode == CASServerMode.MPP:
             self.assertEqual(tuner_results._worker_thread_range, range(4, 65, 4))
             self.assertIsNotNone(tuner_results._worker_optimal_thread_count)
 
-        fig = tuner_results.plot_exec_times()
+        with matplotlib.rc_context(PLOT_RC_PARAMS):
+            fig = tuner_results.plot_exec_times()
         self.assertIsNotNone(fig)
+        plt.close(fig)
+
+
+class TestCASThreadTunerStubbedSession(unittest.TestCase):
+
+    # Returns a stand-in for a CAS session on a server with the given number of nodes
+    @staticmethod
+    def set_up(nodes: int) -> Mock:
+        s = Mock()
+        s.serverstatus.return_value = {'server': pd.DataFrame({'nodes': [nodes]})}
+        return s
+
+    # Execution time with a single minimum at 32 controller threads and 48 worker threads
+    @staticmethod
+    def exec_time(s, c_threads: int, w_threads: int) -> float:
+        return 1 + ((c_threads - 32) ** 2 + (w_threads - 48) ** 2) / 1000
+
+    def tune(self, nodes: int, search_strategy: SearchStrategy, iterations: int = 2, early_stopping: bool = False):
+        action_function = Mock(side_effect=self.exec_time)
+        tuner_results = CASThreadTuner.tune_thread_count(action_function=action_function,
+                                                         setup_function=lambda: self.set_up(nodes),
+                                                         teardown_function=lambda s: None,
+                                                         iterations=iterations, search_strategy=search_strategy,
+                                                         early_stopping=early_stopping)
+        return tuner_results, action_function.call_count
+
+    def test_pattern_search_mpp(self):
+        grid_results, grid_calls = self.tune(3, SearchStrategy.GRID)
+        pattern_results, pattern_calls = self.tune(3, SearchStrategy.PATTERN)
+
+        self.assertEqual(grid_calls, 2 * 16 * 16)
+        self.assertLess(pattern_calls, grid_calls)
+        self.assertFalse(np.isnan(grid_results.mean_exec_times).any())
+        self.assertEqual(np.count_nonzero(~np.isnan(pattern_results.mean_exec_times)), pattern_calls / 2)
+
+        for tuner_results in (grid_results, pattern_results):
+            self.assertEqual(tuner_results.cas_server_mode, CASServerMode.MPP)
+            self.assertEqual(tuner_results.controller_optimal_thread_count, 32)
+            self.assertEqual(tuner_results.worker_optimal_thread_count, 48)
+
+    def test_pattern_search_smp(self):
+        grid_results, grid_calls = self.tune(1, SearchStrategy.GRID)
+        pattern_results, pattern_calls = self.tune(1, SearchStrategy.PATTERN)
+
+        self.assertEqual(grid_calls, 2 * 16)
+        self.assertLess(pattern_calls, grid_calls)
+
+        for tuner_results in (grid_results, pattern_results):
+            self.assertEqual(tuner_results.cas_server_mode, CASServerMode.SMP)
+            self.assertIsNone(tuner_results.worker_optimal_thread_count)
+            self.assertEqual(tuner_results.controller_optimal_thread_count,
+                             grid_results.controller_optimal_thread_count)
+
+    def test_default_parameters(self):
+        action_function = Mock(side_effect=self.exec_time)
+        tuner_results = CASThreadTuner.tune_thread_count(action_function=action_function,
+                                                         setup_function=lambda: self.set_up(3),
+                                                         teardown_function=lambda s: None)
+
+        # The defaults evaluate the full grid of 16 by 16 thread counts with 5 iterations each
+        self.assertEqual(tuner_results.mean_exec_times.shape, (16, 16))
+        self.assertFalse(np.isnan(tuner_results.mean_exec_times).any())
+        self.assertTrue(np.all(tuner_results.iteration_counts == 5))
+        self.assertEqual(action_function.call_count, 5 * 16 * 16)
+        self.assertEqual(tuner_results.objective_measure, Statistic.MEAN)
+
+    def test_latin_hypercube_sample(self):
+        tuner_results, calls = self.tune(3, SearchStrategy.LATIN_HYPERCUBE)
+
+        # With as many samples as thread counts, every thread count of each axis is evaluated exactly once
+        evaluated = ~np.isnan(tuner_results.mean_exec_times)
+        self.assertEqual(calls, 2 * 16)
+        self.assertTrue(np.all(evaluated.sum(axis=0) == 1))
+        self.assertTrue(np.all(evaluated.sum(axis=1) == 1))
+        with matplotlib.rc_context(PLOT_RC_PARAMS):
+            fig = tuner_results.plot_exec_times()
+        self.assertIsNotNone(fig)
+        plt.close(fig)
+
+    def test_latin_hypercube_sample_seed(self):
+        first_sample = CASThreadTuner._latin_hypercube_sample((16, 16), 16, seed=0)
+        second_sample = CASThreadTuner._latin_hypercube_sample((16, 16), 16, seed=0)
+
+        self.assertEqual(first_sample, second_sample)
+
+    def test_invalid_counts(self):
+        with self.assertRaisesRegex(Exception, 'iterations must be at least 1'):
+            self.tune(3, SearchStrategy.GRID, iterations=0)
+        with self.assertRaisesRegex(Exception, 'sample_count must be at least 1'):
+            CASThreadTuner.tune_thread_count(action_function=self.exec_time, setup_function=lambda: self.set_up(3),
+                                             teardown_function=lambda s: None,
+                                             search_strategy=SearchStrategy.LATIN_HYPERCUBE, sample_count=0)
+
+    def test_early_stopping(self):
+        tuner_results, calls = self.tune(3, SearchStrategy.GRID, iterations=5, early_stopping=True)
+
+        self.assertLess(calls, 5 * 16 * 16)
+        self.assertEqual(tuner_results.iteration_counts.sum(), calls)
+        self.assertEqual(tuner_results.controller_optimal_thread_count, 32)
+        self.assertEqual(tuner_results.worker_optimal_thread_count, 48)
+        self.assertEqual(tuner_results.iteration_counts[7, 11], 5)
+
+    def test_max_workers(self):
+        sessions = []
+        closed_sessions = []
+
+        def set_up():
+            sessions.append(self.set_up(3))
+            return sessions[-1]
+
+        tuner_results = CASThreadTuner.tune_thread_count(action_function=self.exec_time, setup_function=set_up,
+                                                         teardown_function=closed_sessions.append, iterations=2,
+                                                         max_workers=4)
+        grid_results, _ = self.tune(3, SearchStrategy.GRID)
+
+        # One session for the server status and at most one per worker, all of them torn down
+        self.assertLessEqual(len(sessions), 5)
+        self.assertCountEqual(closed_sessions, sessions)
+        np.testing.assert_array_equal(tuner_results.mean_exec_times, grid_results.mean_exec_times)
+        self.assertEqual(tuner_results.controller_optimal_thread_count, 32)
+        self.assertEqual(tuner_results.worker_optimal_thread_count, 48)
+
+    def test_max_workers_shared_session(self):
+        s = self.set_up(3)
+
+        with self.assertRaisesRegex(Exception, 'must return a distinct session'):
+            CASThreadTuner.tune_thread_count(action_function=self.exec_time, setup_function=lambda: s,
+                                             teardown_function=lambda s: None, iterations=2, max_workers=4)
+
+    def test_median(self):
+        rng = np.random.default_rng(0)
+        for size in (1, 2, 5, 6):
+            values = rng.random(size)
+            self.assertEqual(CASThreadTuner._median(values), np.median(values))
 
 
 if __name__ == '__main__':
+    import xmlrunner
+
     if len(sys.argv) > 1:
         TestCASThreadTuner.CAS_HOST = sys.argv.pop(1)
         TestCASThreadTuner.CAS_PORT = sys.argv.pop(1)
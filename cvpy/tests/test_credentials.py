@@ -1,13 +1,37 @@
 import sys
 import unittest
-from pathlib import PosixPath, Path
-
-import xmlrunner
+from pathlib import Path
 
 from cvpy.annotation.base.Credentials import Credentials
 
 
 class TestCredentials(unittest.TestCase):
+    auth_file_with_token = None
+    auth_file_with_username_password = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # Parse each auth file once. An error is kept, so that only the tests that read that file fail.
+        cls.default_auth_file_path = Path(Path.home(), Credentials.DEFAULT_ANNOTATION_AUTH_FILE)
+        cls.default_credentials = cls.read_credentials(cls.default_auth_file_path)
+        cls.token_credentials = cls.read_credentials(cls.auth_file_with_token)
+        cls.username_password_credentials = cls.read_credentials(cls.auth_file_with_username_password)
+
+    # Returns the credentials read from auth_file, the error raised reading it, or None if the file does not exist
+    @staticmethod
+    def read_credentials(auth_file):
+        if auth_file and Path(auth_file).exists():
+            try:
+                return Credentials(auth_file=auth_file)
+            except Exception as e:
+                return e
+        return None
+
+    # Fails the test if reading the auth file raised an error, and returns the credentials otherwise
+    def get_credentials(self, credentials):
+        if isinstance(credentials, Exception):
+            self.fail(f'Reading the auth file failed: {credentials}')
+        return credentials
 
     # Create Credentials object with username and password
     def test_credentials_user_password(self):
@@ -28,6 +52,16 @@ class TestCredentials(unittest.TestCase):
         self.assertIsNotNone(credentials.token)
         self.assertEqual(credentials.get_auth_header(), dict(Authorization=f'token {token}'))
 
+    # Verify that the returned auth header can be modified, and that it follows a change of the token
+    def test_credentials_auth_header_token_changed(self):
+        credentials = Credentials(token='abc1def2ghi')
+        auth_header = credentials.get_auth_header()
+        auth_header['Content-Type'] = 'application/json'
+        self.assertEqual(credentials.get_auth_header(), dict(Authorization='token abc1def2ghi'))
+
+        credentials.token = 'jkl3mno4pqr'
+        self.assertEqual(credentials.get_auth_header(), dict(Authorization='token jkl3mno4pqr'))
+
     # Call get_auth_header before token is set
     def test_credentials_token_not_set(self):
         try:
@@ -41,31 +75,36 @@ class TestCredentials(unittest.TestCase):
 
     # Read credentials from the default file ~/.annotation_auth
     def test_credentials_default_authfile(self):
-        default_auth_file_path = Path(Path.home(), Credentials.DEFAULT_ANNOTATION_AUTH_FILE)
-        self.assertTrue(default_auth_file_path.exists(), f'The default file {default_auth_file_path} does not exist.')
+        if self.default_credentials is None:
+            self.skipTest(f'The default file {self.default_auth_file_path} does not exist.')
 
-        credentials = Credentials()
+        credentials = self.get_credentials(self.default_credentials)
         self.assertTrue(credentials.token or (credentials.username and credentials.password))
 
     # Read token from a user specified auth file
     def test_credentials_authfile_with_token(self):
-        auth_file_path = Path(TestCredentials.auth_file_with_token)
-        self.assertTrue(auth_file_path.exists(), f'The file {auth_file_path} does not exist.')
+        if not self.auth_file_with_token:
+            self.skipTest('No auth file with a token is configured.')
+        self.assertIsNotNone(self.token_credentials, f'The file {self.auth_file_with_token} does not exist.')
 
-        credentials = Credentials(auth_file=TestCredentials.auth_file_with_token)
+        credentials = self.get_credentials(self.token_credentials)
         self.assertIsNotNone(credentials.token)
 
     # Read username and password from a user specified auth file
     def test_credentials_authfile_with_username_password(self):
-        auth_file_path = Path(TestCredentials.auth_file_with_username_password)
-        self.assertTrue(auth_file_path.exists(), f'The file {auth_file_path} does not exist.')
+        if not self.auth_file_with_username_password:
+            self.skipTest('No auth file with a username and password is configured.')
+        self.assertIsNotNone(self.username_password_credentials,
+                             f'The file {self.auth_file_with_username_password} does not exist.')
 
-        credentials = Credentials(auth_file=TestCredentials.auth_file_with_username_password)
+        credentials = self.get_credentials(self.username_password_credentials)
         self.assertIsNotNone(credentials.username)
         self.assertIsNotNone(credentials.password)
 
 
 if __name__ == '__main__':
+    import xmlrunner
+
     if len(sys.argv) > 1:
         TestCredentials.auth_file_with_username_password = sys.argv.pop(1)
         TestCredentials.auth_file_with_token = sys.argv.pop(1)
@@ -4,12 +4,14 @@ from pathlib import Path
 from unittest.mock import Mock
 
 import cvpy
-import xmlrunner
 from cvpy.annotation.base.Credentials import Credentials
 from cvpy.annotation.cvat.CVATAuthenticator import CVATAuthenticator
 
 
 class TestCVATAuthenticator(unittest.TestCase):
+    cvat_url = None
+    cvat_username = None
+    cvat_password = None
 
     def test_gen_cvat_token(self):
         # Mock the CVAT URL and username input
@@ -28,6 +30,8 @@ class TestCVATAuthenticator(unittest.TestCase):
 
 
 if __name__ == '__main__':
+    import xmlrunner
+
     if len(sys.argv) > 1:
         TestCVATAuthenticator.cvat_url = sys.argv.pop(1)
         TestCVATAuthenticator.cvat_username = sys.argv.pop(1)
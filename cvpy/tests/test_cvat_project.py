@@ -1,289 +1,413 @@
+import hashlib
 import io
 import sys
+import tempfile
 import time
 import unittest
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
 from http import HTTPStatus
+from unittest.mock import Mock, patch
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import swat
-import xmlrunner
 import numpy as np
+from PIL import Image
 from cvpy.annotation.base.AnnotationLabel import AnnotationLabel
 from cvpy.annotation.base.AnnotationType import AnnotationType
 from cvpy.annotation.base.Credentials import Credentials
+from cvpy.annotation.cvat.CVATAuthenticator import CVATAuthenticator
 from cvpy.annotation.cvat.CVATProject import CVATProject
 from cvpy.base.ImageTable import ImageTable
 
 
-class TestCVATProject(unittest.TestCase):
+# Tags that the classification test adds in CVAT, as (annotation ID, frame, label name)
+CLASSIFICATION_TAGS = [
+    (17, 0, 'Person'),
+    (18, 1, 'Mountain'),
+    (20, 2, 'Person'),
+    (21, 3, 'Mountain'),
+    (22, 4, 'Mountain')
+]
 
-    def setUp(self) -> None:
-        self.cas_connection = swat.CAS(hostname=TestCVATProject.cas_host, port=TestCVATProject.cas_port,
-                                       username=TestCVATProject.cas_username, password=TestCVATProject.cas_password,
-                                       protocol=TestCVATProject.cas_protocol)
+# Rectangles that the object detection test adds in CVAT, as (annotation ID, frame, label name, points)
+OBJECT_DETECTION_SHAPES = [
+    (282, 0, 'Person', [275.5446428571413, 43.85649350649146, 426.08035714285506, 197.1292207792194]),
+    (283, 0, 'Person', [584.8271103896095, 26.065909090908463, 731.2573051948038, 227.2363636363625]),
+    (284, 1, 'Person', [321.93652597402615, 140.7501623376629, 446.32938311688304, 334.2501623376629]),
+    (285, 2, 'Mountain', [385.49659090909154, 240.6090909090908, 702.9852272727276, 306.0863636363629]),
+    (286, 3, 'Person', [439.77077922078024, 453.1831168831177, 558.9915584415594, 599.2285714285717]),
+    (287, 3, 'Person', [1846.5759740259746, 733.351948051948, 2016.465584415584, 933.0467532467537]),
+    (288, 4, 'Mountain', [981.298828125, 893.5068359375, 1656.623046875, 1238.9609375])
+]
 
-        self.cas_connection.loadactionset('image')
 
-        self.caslib_name = 'dlib'
+# Writable file object that keeps only the SHA-256 digest of the bytes written to it
+class Sha256Writer(io.RawIOBase):
 
-        self.cas_connection.addcaslib(name=self.caslib_name,
-                                      activeOnAdd=False,
-                                      path=TestCVATProject.datapath,
-                                      dataSource='PATH',
-                                      subdirectories=True,
-                                      session=False)
+    def __init__(self):
+        super().__init__()
+        self._sha256 = hashlib.sha256()
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        self._sha256.update(b)
+        return len(b)
+
+    def digest(self):
+        return self._sha256.digest()
+
+
+class TestCVATProject(unittest.TestCase):
+    cas_host = None
+    cas_port = None
+    cas_username = None
+    cas_password = None
+    cas_protocol = None
+    datapath = None
+    cvat_url = None
+    cvat_username = None
+    cvat_password = None
+
+    # Initial interval and timeout in seconds for polling CVAT until the data of uploaded tasks is available
+    task_data_poll_interval = 0.1
+    task_data_timeout = 5
+
+    # Size in bytes up to which a downloaded chunk of task frames is kept in memory before it is spooled to disk
+    chunk_spool_size = 1024 * 1024
+
+    # Project shared by the save tests, created by the first of them that runs
+    _saved_project = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # These tests need live CAS and CVAT servers, TestCVATProjectUnit covers the project without them
+        if not TestCVATProject.cas_host or not TestCVATProject.cvat_url:
+            raise unittest.SkipTest('The CAS and CVAT servers are not configured.')
+
+        cls.cas_connection = swat.CAS(hostname=TestCVATProject.cas_host, port=TestCVATProject.cas_port,
+                                      username=TestCVATProject.cas_username, password=TestCVATProject.cas_password,
+                                      protocol=TestCVATProject.cas_protocol)
+        # Close the connection even if the rest of the setup fails, as tearDownClass only runs after it succeeds
+        cls.addClassCleanup(cls.cas_connection.close)
+
+        cls.cas_connection.loadactionset('image')
+
+        cls.caslib_name = 'dlib'
+
+        cls.cas_connection.addcaslib(name=cls.caslib_name,
+                                     activeOnAdd=False,
+                                     path=TestCVATProject.datapath,
+                                     dataSource='PATH',
+                                     subdirectories=True,
+                                     session=False)
+        cls.addClassCleanup(cls.cas_connection.dropcaslib, caslib=cls.caslib_name)
+
+        # Load the images posted to CVAT once for all tests. The table names differ from the image table names of
+        # the saved projects, which the resume tests load into the same session.
+        cls.cas_table_encoded = cls.cas_connection.CASTable('cvat_images_encoded', replace=True)
+        cls.cas_connection.image.loadimages(path='images',
+                                            labellevels=5,
+                                            casout=cls.cas_table_encoded,
+                                            caslib=cls.caslib_name,
+                                            decode=False)
+
+        # Decode the loaded images in memory instead of reading them from disk again. processimages needs a step,
+        # and rescaling to 8 bits leaves the 8-bit images unchanged, which test_cvat_project_decoded_images checks.
+        # processimages writes the image columns itself, so only the label is copied.
+        cls.cas_table_decoded = cls.cas_connection.CASTable('cvat_images_decoded', replace=True)
+        cls.cas_connection.image.processimages(table=cls.cas_table_encoded,
+                                               casout=cls.cas_table_decoded,
+                                               steps=[{'step': {'stepType': 'RESCALE', 'type': 'TO_8U'}}],
+                                               copyVars=['_label_'],
+                                               decode=True)
+
+        # Every loaded image must have been decoded
+        encoded_rows = cls.cas_table_encoded.tableinfo().TableInfo.Rows.values[0]
+        decoded_rows = cls.cas_table_decoded.tableinfo().TableInfo.Rows.values[0]
+        if decoded_rows != encoded_rows:
+            raise Exception(f'Decoded {decoded_rows} of the {encoded_rows} loaded images.')
+
+        # Labels of the projects created by the tests, and credentials that keep the token of the first login
+        cls.labels = [AnnotationLabel(name='Mountain', color='orange'), AnnotationLabel(name='Person', color='green')]
+        cls.credentials = Credentials(TestCVATProject.cvat_username, TestCVATProject.cvat_password)
+
+        # Reuse pooled connections for all of the HTTP requests the tests send to CVAT
+        cls.http_session = requests.Session()
+        cls.addClassCleanup(cls.http_session.close)
+        http_adapter = HTTPAdapter(pool_maxsize=16, max_retries=Retry(total=3, backoff_factor=0.2))
+        cls.http_session.mount('http://', http_adapter)
+        cls.http_session.mount('https://', http_adapter)
+
+    # Returns a project name that no other test run uses, so runs against the same CVAT server do not collide.
+    # The save tests keep fixed names, the names of the files they save are derived from the project name.
+    @staticmethod
+    def _unique_project_name(name):
+        return f'{name}-{uuid.uuid4().hex[:8]}'
+
+    # Deletes a project created by a test from CVAT, together with its tasks. This runs as a cleanup, so an error
+    # is ignored rather than hiding the outcome of the test.
+    @staticmethod
+    def _delete_project(cvat_project):
+        try:
+            cvat_project._delete_project_in_cvat()
+        except Exception:
+            pass
+
+    # Returns the project that the save tests save, with the encoded images posted to it. Saving does not change the
+    # project, so it is created once and deleted from CVAT after the last test of the class.
+    @classmethod
+    def _get_saved_project(cls):
+        if cls._saved_project is None:
+            cvat_project = CVATProject(url=TestCVATProject.cvat_url, cas_connection=cls.cas_connection,
+                                       credentials=cls.credentials, project_name='MyDemoProject_SaveTest',
+                                       annotation_type=AnnotationType.OBJECT_DETECTION, labels=cls.labels)
+            cls.addClassCleanup(cls._delete_project, cvat_project)
+            cvat_project.post_images(ImageTable(cls.cas_table_encoded))
+            cls._saved_project = cvat_project
+        return cls._saved_project
+
+    # Resumes a saved project and drops the tables it loads into the shared session once the test is done
+    def _resume(self, **resume_parms):
+        cvat_project = CVATProject.resume(cas_connection=self.cas_connection, **resume_parms)
+        self.addCleanup(self.cas_connection.droptable, cvat_project.project_name, quiet=True)
+        for task in cvat_project.get_tasks():
+            self.addCleanup(self.cas_connection.droptable, task.image_table_name, quiet=True)
+        return cvat_project
+
+    # Sets the active caslib of the shared session and restores the previous one once the test is done
+    def _set_active_caslib(self, caslib):
+        caslibinfo = self.cas_connection.caslibinfo()['CASLibInfo']
+        active_caslib = caslibinfo[caslibinfo.Active == 1].Name.values[0]
+        self.cas_connection.setsessopt(caslib=caslib)
+        self.addCleanup(self.cas_connection.setsessopt, caslib=active_caslib)
+
+    # Note: CVAT will throw an internal server error exception if we attempt to access the tasks data too soon after
+    #       an upload. So we poll the task metadata, backing off exponentially, until it is available or the timeout
+    #       expires.
+    def _wait_for_task_data(self, cvat_project):
+        deadline = time.monotonic() + TestCVATProject.task_data_timeout
+        for task in cvat_project.get_tasks():
+            delay = TestCVATProject.task_data_poll_interval
+            while True:
+                response = self.http_session.get(f'{cvat_project.url}/api/tasks/{task.task_id}/data/meta',
+                                                 headers=cvat_project.credentials.get_auth_header())
+                if response.status_code == HTTPStatus.OK:
+                    break
+                if time.monotonic() >= deadline:
+                    self.fail(f'The data of task {task.task_id} was not ready within '
+                              f'{TestCVATProject.task_data_timeout} seconds, last status code: '
+                              f'{response.status_code}')
+                time.sleep(delay)
+                delay = min(delay * 2, 1.0)
 
-    def tearDown(self) -> None:
-        self.cas_connection.dropcaslib(caslib=self.caslib_name)
-        self.cas_connection.close()
-    
     # Create an instance of CVATProject
     def test_cvat_project(self):
         url = TestCVATProject.cvat_url
 
-        project_name = 'Test Project'
+        project_name = self._unique_project_name('Test Project')
         annotation_type = AnnotationType.OBJECT_DETECTION
 
-        mountain_label = AnnotationLabel(name='Mountain', color='orange')
-        person_label = AnnotationLabel(name='Person', color='green')
-
-        labels = [mountain_label, person_label]
-
         credentials = Credentials()
         cvat_project = CVATProject(url=url, cas_connection=self.cas_connection, credentials=credentials,
                                    project_name=project_name, annotation_type=annotation_type,
-                                   labels=labels)
+                                   labels=self.labels)
+        self.addCleanup(self._delete_project, cvat_project)
 
         self.assertEqual(cvat_project.url, url)
         self.assertEqual(cvat_project.cas_connection, self.cas_connection)
         self.assertEqual(cvat_project.credentials, credentials)
         self.assertEqual(cvat_project.project_name, project_name)
         self.assertEqual(cvat_project.annotation_type, annotation_type)
-        self.assertEqual(cvat_project.labels, labels)
+        self.assertEqual(cvat_project.labels, self.labels)
 
         self.assertIsNotNone(cvat_project.project_id)
 
-        # Delete the project from CVAT
-        cvat_project._delete_project_in_cvat()
-
     # Create an instance of CVATProject with invalid CVAT credentials
     def test_cvat_project_invalid_user_password(self):
         url = TestCVATProject.cvat_url
         credentials = Credentials(username='foo', password='bar')
-        try:
-            cvat_project = CVATProject(url=url, credentials=credentials)
-        except Exception as e:
-            self.assertRegex(str(e), 'Unable to log in with provided credentials')
+        # A rejected login is answered right away, so a short timeout only cuts a hanging server short
+        with patch.object(CVATAuthenticator, 'LOGIN_TIMEOUT', 2), \
+                self.assertRaisesRegex(Exception, 'Unable to log in with provided credentials'):
+            CVATProject(url=url, credentials=credentials)
+
+    # Verify that the images decoded in memory match the same images decoded by loadimages
+    def test_cvat_project_decoded_images(self):
+        decoded_image = self.cas_table_decoded.fetch(to=1, fetchvars=['_path_', '_image_'], sastypes=False)['Fetch']
+        image_path = decoded_image['_path_'].iloc[0]
+
+        # Load the same image from disk, by its path relative to the caslib
+        relative_path = image_path[len(TestCVATProject.datapath.rstrip('/')):].lstrip('/')
+        loaded_table = self.cas_connection.CASTable('cvat_images_sample', replace=True)
+        self.cas_connection.image.loadimages(path=relative_path,
+                                             casout=loaded_table,
+                                             caslib=self.caslib_name,
+                                             decode=True)
+        self.addCleanup(self.cas_connection.droptable, 'cvat_images_sample', quiet=True)
+        loaded_image = loaded_table.fetch(to=1, fetchvars=['_path_', '_image_'], sastypes=False)['Fetch']
+
+        self.assertEqual(loaded_image['_path_'].iloc[0], image_path)
+        self.assertTrue(loaded_image['_image_'].iloc[0] == decoded_image['_image_'].iloc[0])
 
     # Post images to a project.
     def test_cvat_project_post_images(self):
 
-        cas_table_encoded = self.cas_connection.CASTable('cas_table_encoded')
-        self.cas_connection.image.loadimages(path='images',
-                                             labellevels=5,
-                                             casout=cas_table_encoded,
-                                             caslib=self.caslib_name,
-                                             decode=False)
-
-        cas_table_decoded = self.cas_connection.CASTable('cas_table_decoded')
-        self.cas_connection.image.loadimages(path='images',
-                                             labellevels=5,
-                                             casout=cas_table_decoded,
-                                             caslib=self.caslib_name,
-                                             decode=True)
+        image_table_encoded = ImageTable(self.cas_table_encoded)
+        image_table_decoded = ImageTable(self.cas_table_decoded)
 
-        image_table_encoded = ImageTable(cas_table_encoded)
-        image_table_decoded = ImageTable(cas_table_decoded)
+        # The decoded table keeps the columns that post_images needs
+        self.assertTrue(image_table_decoded.has_decoded_images())
+        for column in (image_table_decoded.id, image_table_decoded.image, image_table_decoded.type):
+            self.assertIsNotNone(column)
 
         # Create a CVATProject.
         url = TestCVATProject.cvat_url
 
-        project_name = 'Test Project'
+        project_name = self._unique_project_name('Test Project')
         annotation_type = AnnotationType.OBJECT_DETECTION
 
-        mountain_label = AnnotationLabel(name='Mountain', color='orange')
-        person_label = AnnotationLabel(name='Person', color='green')
-
-        labels = [mountain_label, person_label]
-
-        credentials = Credentials(TestCVATProject.cvat_username, TestCVATProject.cvat_password)
+        credentials = self.credentials
         cvat_project = CVATProject(url=url, cas_connection=self.cas_connection, credentials=credentials,
                                    project_name=project_name, annotation_type=annotation_type,
-                                   labels=labels)
+                                   labels=self.labels)
+        self.addCleanup(self._delete_project, cvat_project)
 
         # Post the images to the CVATProject.
+        # The uploads are posted one after the other: post_images fetches the images through the project's CAS
+        # connection, and a CAS connection cannot run actions from several threads at once.
         cvat_project.post_images(image_table_encoded)
         cvat_project.post_images(image_table_decoded)
 
-        # Note: CVAT will throw an internal server error exception if we attempt to access the tasks
-        #       data to soon after an upload. So we have a sleep here to prevent the issue.
-        time.sleep(5)
+        # Wait until CVAT can serve the data of the uploaded tasks.
+        self._wait_for_task_data(cvat_project)
 
         # Get the CVATTask objects we created and verify what was populated.
         tasks = cvat_project.get_tasks()
         self.assertEqual(len(tasks), 2)
 
         for task in tasks:
-            # Get the task metadata from CVAT and then verify that it matches the tasks post_images created.
             self.assertIsNotNone(task.task_id)
 
-            response = requests.get(f'{url}/api/tasks/{task.task_id}/data/meta', headers=credentials.get_auth_header())
-            self.assertEqual(response.status_code, HTTPStatus.OK)
-            self.assertEqual(response.json()['size'], task.image_table.table.tableinfo().TableInfo.Rows.values[0])
-            self.assertEqual(response.json()['start_frame'], task.start_image_id)
-            self.assertEqual(response.json()['stop_frame'], task.end_image_id)
-
-            # Verify the image data and metadata between CAS and CVAT.
-            cvat_frames = response.json()['frames']
-            cas_images = task.image_table.table.fetchImages(fetchImagesVars=["_id_", "_type_"]).Images
-            for index, frame_number in enumerate(range(task.start_image_id, task.end_image_id + 1)):
-                # Check the image names.
-                expected_extension = 'jpg' if (task.image_table.has_decoded_images()) else cas_images.iloc[index]._type_
-                expected_name = f'{cas_images.iloc[index]._id_}.{expected_extension}'
-                self.assertEqual(cvat_frames[index]['name'], expected_name)
-
-                # Check the image bytes. (We have to GET the image from CVAT first.)
-                response = requests.get(f'{url}/api/tasks/{task.task_id}/data',
-                                        headers=credentials.get_auth_header(),
-                                        params=dict(quality='original', number=frame_number, type='frame'))
+        # The task metadata and frames are fetched from CVAT and the CAS images are encoded concurrently.
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            # Get the metadata of all tasks from CVAT at once, CVAT has no endpoint that returns it for several tasks.
+            def get_task_meta(task):
+                return self.http_session.get(f'{url}/api/tasks/{task.task_id}/data/meta',
+                                             headers=credentials.get_auth_header())
 
+            for task, response in zip(tasks, executor.map(get_task_meta, tasks)):
+                # Verify that the task metadata matches the tasks post_images created.
                 self.assertEqual(response.status_code, HTTPStatus.OK)
-                cvat_image_bytes = io.BytesIO(response.content)
+                task_meta = response.json()
+                self.assertEqual(task_meta['size'], task.image_table.table.tableinfo().TableInfo.Rows.values[0])
+                self.assertEqual(task_meta['start_frame'], task.start_image_id)
+                self.assertEqual(task_meta['stop_frame'], task.end_image_id)
+
+                # Verify the image data and metadata between CAS and CVAT.
+                cvat_frames = task_meta['frames']
+                cas_images = task.image_table.table.fetchImages(fetchImagesVars=["_id_", "_type_"]).Images
+                # Pull the columns into plain lists once, instead of indexing the DataFrame for every frame.
+                cas_image_list = cas_images['Image'].tolist()
+                cas_id_list = cas_images['_id_'].tolist()
+                if task.image_table.has_decoded_images():
+                    expected_extensions = ['jpg'] * len(cas_image_list)
+                else:
+                    expected_extensions = cas_images['_type_'].tolist()
 
-                cas_image_bytes = io.BytesIO()
-                pillow_format = 'JPEG' if expected_extension == 'jpg' else expected_extension
-                cas_images.iloc[index].Image.save(cas_image_bytes, format=pillow_format)
-                self.assertEqual(cvat_image_bytes.getvalue(), cas_image_bytes.getvalue())
-
-        # Delete the project from CVAT (which will also delete tasks associated with the project).
-        cvat_project._delete_project_in_cvat()
+                # Check the image names.
+                for cvat_frame, cas_id, expected_extension in zip(cvat_frames, cas_id_list, expected_extensions):
+                    self.assertEqual(cvat_frame['name'], f'{cas_id}.{expected_extension}')
+
+                # Check the image bytes. (We have to GET the images from CVAT first.)
+                # CVAT serves the original images of a task in zip archives of chunk_size frames each, so the images
+                # are downloaded a chunk at a time instead of a frame at a time.
+                # Images in lossless formats are compared by their pixels, which avoids encoding the CAS images.
+                # JPEG encoding is lossy, so JPEG images are encoded again and compared with the uploaded bytes through
+                # their SHA-256 digests, computed while the bytes are read from the archive.
+                chunk_size = task_meta['chunk_size']
+
+                def read_frame(chunk, entry, extension):
+                    with chunk.open(entry) as frame:
+                        if extension != 'jpg':
+                            return np.asarray(Image.open(frame))
+                        frame_hash = hashlib.sha256()
+                        for block in iter(lambda: frame.read(64 * 1024), b''):
+                            frame_hash.update(block)
+                        return frame_hash.digest()
+
+                # zipfile needs a seekable file, so each chunk is streamed into a spooled file that moves to disk
+                # once it is larger than chunk_spool_size, instead of being held in memory as a whole.
+                def get_chunk(chunk_number):
+                    with self.http_session.get(f'{url}/api/tasks/{task.task_id}/data',
+                                               headers=credentials.get_auth_header(),
+                                               params=dict(quality='original', number=chunk_number, type='chunk'),
+                                               stream=True) as response, \
+                            tempfile.SpooledTemporaryFile(max_size=TestCVATProject.chunk_spool_size) as spool:
+                        if response.status_code != HTTPStatus.OK:
+                            return response.status_code, []
+                        for block in response.iter_content(64 * 1024):
+                            spool.write(block)
+                        spool.seek(0)
+                        chunk_extensions = expected_extensions[chunk_number * chunk_size:
+                                                               (chunk_number + 1) * chunk_size]
+                        with zipfile.ZipFile(spool) as chunk:
+                            return response.status_code, [read_frame(chunk, entry, extension) for entry, extension
+                                                          in zip(chunk.infolist(), chunk_extensions)]
+
+                def expected_frame(image, extension):
+                    if extension != 'jpg':
+                        return np.asarray(image)
+                    image_hash = Sha256Writer()
+                    image.save(image_hash, format='JPEG')
+                    return image_hash.digest()
+
+                chunk_count = -(-len(expected_extensions) // chunk_size)
+                chunks = executor.map(get_chunk, range(chunk_count))
+                expected_frames = executor.map(expected_frame, cas_image_list, expected_extensions)
+                cvat_frame_data = []
+                for status_code, chunk_frames in chunks:
+                    self.assertEqual(status_code, HTTPStatus.OK)
+                    cvat_frame_data.extend(chunk_frames)
+                self.assertEqual(len(cvat_frame_data), len(expected_extensions))
+                for cvat_frame, expected in zip(cvat_frame_data, expected_frames):
+                    self.assertTrue(np.array_equal(cvat_frame, expected))
 
     def test_cvat_project_save(self):
-
-        cas_table_encoded = self.cas_connection.CASTable('cas_table_encoded_save_test')
-        self.cas_connection.image.loadimages(path='images',
-                                             labellevels=5,
-                                             casout=cas_table_encoded,
-                                             caslib=self.caslib_name,
-                                             decode=False)
-
-        # Create a CVATProject.
-        url = TestCVATProject.cvat_url
-
-        project_name = 'MyDemoProject_SaveTest'
-        annotation_type = AnnotationType.OBJECT_DETECTION
-
-        mountain_label = AnnotationLabel(name='Mountain', color='orange')
-        person_label = AnnotationLabel(name='Person', color='green')
-
-        labels = [mountain_label, person_label]
-
-        credentials = Credentials(TestCVATProject.cvat_username, TestCVATProject.cvat_password)
-        cvat_project = CVATProject(url=url, cas_connection=self.cas_connection, credentials=credentials,
-                                   project_name=project_name, annotation_type=annotation_type,
-                                   labels=labels)
-
-        # Post the images to the CVATProject.
-        image_table_encoded = ImageTable(cas_table_encoded)
-        cvat_project.post_images(image_table_encoded)
+        # Get the project with the posted images.
+        cvat_project = self._get_saved_project()
 
         # Save the project
+        self.addCleanup(self.cas_connection.droptable, cvat_project.project_name, quiet=True)
         cvat_project.save(caslib=self.caslib_name, relative_path='cvpy', replace=True)
 
     def test_cvat_project_save_no_caslib(self):
-
-        cas_table_encoded = self.cas_connection.CASTable('cas_table_encoded_save_test')
-        self.cas_connection.image.loadimages(path='images',
-                                             labellevels=5,
-                                             casout=cas_table_encoded,
-                                             caslib=self.caslib_name,
-                                             decode=False)
-
-        # Create a CVATProject.
-        url = TestCVATProject.cvat_url
-
-        project_name = 'MyDemoProject_SaveTest'
-        annotation_type = AnnotationType.OBJECT_DETECTION
-
-        mountain_label = AnnotationLabel(name='Mountain', color='orange')
-        person_label = AnnotationLabel(name='Person', color='green')
-
-        labels = [mountain_label, person_label]
-
-        credentials = Credentials(TestCVATProject.cvat_username, TestCVATProject.cvat_password)
-        cvat_project = CVATProject(url=url, cas_connection=self.cas_connection, credentials=credentials,
-                                   project_name=project_name, annotation_type=annotation_type,
-                                   labels=labels)
-
-        # Post the images to the CVATProject.
-        image_table_encoded = ImageTable(cas_table_encoded)
-        cvat_project.post_images(image_table_encoded)
+        # Get the project with the posted images.
+        cvat_project = self._get_saved_project()
 
         # Save the project with no caslib specified
+        self.addCleanup(self.cas_connection.droptable, cvat_project.project_name, quiet=True)
         cvat_project.save(relative_path='cvpy', replace=True)
 
     def test_cvat_project_save_no_relative_path(self):
-
-        cas_table_encoded = self.cas_connection.CASTable('cas_table_encoded_save_test')
-        self.cas_connection.image.loadimages(path='images',
-                                             labellevels=5,
-                                             casout=cas_table_encoded,
-                                             caslib=self.caslib_name,
-                                             decode=False)
-
-        # Create a CVATProject.
-        url = TestCVATProject.cvat_url
-
-        project_name = 'MyDemoProject_SaveTest'
-        annotation_type = AnnotationType.OBJECT_DETECTION
-
-        mountain_label = AnnotationLabel(name='Mountain', color='orange')
-        person_label = AnnotationLabel(name='Person', color='green')
-
-        labels = [mountain_label, person_label]
-
-        credentials = Credentials(TestCVATProject.cvat_username, TestCVATProject.cvat_password)
-        cvat_project = CVATProject(url=url, cas_connection=self.cas_connection, credentials=credentials,
-                                   project_name=project_name, annotation_type=annotation_type,
-                                   labels=labels)
-
-        # Post the images to the CVATProject.
-        image_table_encoded = ImageTable(cas_table_encoded)
-        cvat_project.post_images(image_table_encoded)
+        # Get the project with the posted images.
+        cvat_project = self._get_saved_project()
 
         # Save the project with no relative path specified
+        self.addCleanup(self.cas_connection.droptable, cvat_project.project_name, quiet=True)
         cvat_project.save(caslib=self.caslib_name, replace=True)
 
     def test_cvat_project_save_no_caslib_no_relative_path(self):
-
-        cas_table_encoded = self.cas_connection.CASTable('cas_table_encoded_save_test')
-        self.cas_connection.image.loadimages(path='images',
-                                             labellevels=5,
-                                             casout=cas_table_encoded,
-                                             caslib=self.caslib_name,
-                                             decode=False)
-
-        # Create a CVATProject.
-        url = TestCVATProject.cvat_url
-
-        project_name = 'MyDemoProject_SaveTest'
-        annotation_type = AnnotationType.OBJECT_DETECTION
-
-        mountain_label = AnnotationLabel(name='Mountain', color='orange')
-        person_label = AnnotationLabel(name='Person', color='green')
-
-        labels = [mountain_label, person_label]
-
-        credentials = Credentials(TestCVATProject.cvat_username, TestCVATProject.cvat_password)
-        cvat_project = CVATProject(url=url, cas_connection=self.cas_connection, credentials=credentials,
-                                   project_name=project_name, annotation_type=annotation_type,
-                                   labels=labels)
-
-        # Post the images to the CVATProject.
-        image_table_encoded = ImageTable(cas_table_encoded)
-        cvat_project.post_images(image_table_encoded)
+        # Get the project with the posted images.
+        cvat_project = self._get_saved_project()
 
         # Save the project with no caslib and no relative path specified
+        self.addCleanup(self.cas_connection.droptable, cvat_project.project_name, quiet=True)
         cvat_project.save(replace=True)
     
     # Function used for testing CVAT resume scenerios
@@ -291,19 +415,13 @@ class TestCVATProject(unittest.TestCase):
         # Verify all project attributes are set correctly
         assert cvat_project.project_version == 1
         assert cvat_project.project_name == 'MyDemoProject'
-        assert cvat_project.project_id == 285
+        assert isinstance(cvat_project.project_id, int) and cvat_project.project_id > 0
         assert cvat_project.annotation_type == AnnotationType.OBJECT_DETECTION
         assert cvat_project.credentials.username is None
         assert cvat_project.credentials.password is None
         assert len(cvat_project.labels) == 2
 
-        for label in cvat_project.labels:
-            if label.name == 'Mountain':
-                assert label.color == 'orange'
-            elif label.name == 'Person':
-                assert label.color == 'green'
-            else:
-                assert False
+        assert {label.name: label.color for label in cvat_project.labels} == {'Mountain': 'orange', 'Person': 'green'}
 
         for task in cvat_project.tasks:
             assert task.image_table_name == 'cas_table_encoded'
@@ -311,56 +429,44 @@ class TestCVATProject(unittest.TestCase):
 
     def test_cvat_project_resume(self):
         # Create project
-        cvat_project_relativepath_caslib = CVATProject.resume(project_name='MyDemoProject', cas_connection=self.cas_connection,
-                                          caslib=self.caslib_name, relative_path='cvpy')
+        cvat_project_relativepath_caslib = self._resume(project_name='MyDemoProject', caslib=self.caslib_name,
+                                                        relative_path='cvpy')
         # Assertion
         self._verify_cvat_project_attributes(cvat_project_relativepath_caslib)
 
     def test_cvat_project_resume_default_caslib(self):
         # Set Active caslib
-        self.cas_connection.setsessopt(caslib='dlib')
+        self._set_active_caslib('dlib')
         # Create project
-        cvat_project_relativepath_only = CVATProject.resume(project_name='MyDemoProject', cas_connection=self.cas_connection,
-                                          relative_path='cvpy')
+        cvat_project_relativepath_only = self._resume(project_name='MyDemoProject', relative_path='cvpy')
         # Assertions
         self._verify_cvat_project_attributes(cvat_project_relativepath_only)
         
     def test_cvat_project_resume_default_path(self):
         # Create Project
-        cvat_project_caslib_only = CVATProject.resume(project_name='MyDemoProject', cas_connection=self.cas_connection,
-                                          caslib=self.caslib_name)
+        cvat_project_caslib_only = self._resume(project_name='MyDemoProject', caslib=self.caslib_name)
         # Assertions
         self._verify_cvat_project_attributes(cvat_project_caslib_only)
 
     def test_cvat_project_resume_default_caslib_default_path(self):
         # Set Active caslib
-        self.cas_connection.setsessopt(caslib='dlib')
+        self._set_active_caslib('dlib')
         # Create Project
-        cvat_project_neither_relativepath_caslib = CVATProject.resume(project_name='MyDemoProject', cas_connection=self.cas_connection)
+        cvat_project_neither_relativepath_caslib = self._resume(project_name='MyDemoProject')
         # Assertions
         self._verify_cvat_project_attributes(cvat_project_neither_relativepath_caslib)
         
     
     def test_cvat_project_get_annotation_classification(self):
 
-        # Load the images to post to CVAT.
-        cas_table_encoded = self.cas_connection.CASTable('cas_table_encoded')
-        self.cas_connection.image.loadimages(labellevels=5,
-                                             path='images',
-                                             casout=cas_table_encoded,
-                                             caslib=self.caslib_name,
-                                             decode=False)
+        # The images to post to CVAT are loaded in setUpClass.
+        cas_table_encoded = self.cas_table_encoded
 
         # Create a CVATProject.
         url = "https://cvdata.unx.sas.com:8080"
-        project_name = 'ClassificationTest'
+        project_name = self._unique_project_name('ClassificationTest')
         annotation_type = AnnotationType.CLASSIFICATION
 
-        # Define the labels for the CVAT project.
-        mountain_label = AnnotationLabel(name='Mountain', color='orange')
-        person_label = AnnotationLabel(name='Person', color='green')
-        labels = [mountain_label, person_label]
-
         # Get authentication information for CVAT.
         credentials = Credentials()
 
@@ -370,103 +476,64 @@ class TestCVATProject(unittest.TestCase):
         # Create the CVAT Project.
         cvat_project = CVATProject(url=url, cas_connection=self.cas_connection, credentials=credentials,
                                    project_name=project_name, annotation_type=annotation_type,
-                                   labels=labels)
+                                   labels=self.labels)
+        self.addCleanup(self._delete_project, cvat_project)
 
         # Post the images to the project.
         cvat_project.post_images(image_table_encoded)
 
-        # Wait before trying to access the project.
-        time.sleep(5)
+        # Wait until CVAT can serve the data of the uploaded task.
+        self._wait_for_task_data(cvat_project)
 
         # Get the task response.
-        tasks = cvat_project.get_tasks()
-        for task in tasks:
-            if task.image_table == image_table_encoded:
-                main_task = task
-        task_response = requests.get(f'{cvat_project.url}/api/tasks/' + str(main_task.task_id),
-                                     headers=cvat_project.credentials.get_auth_header())
+        main_task = next((task for task in cvat_project.get_tasks()
+                          if task.image_table.table.name == image_table_encoded.table.name), None)
+        self.assertIsNotNone(main_task)
+        task_response = self.http_session.get(f'{cvat_project.url}/api/tasks/' + str(main_task.task_id),
+                                              headers=cvat_project.credentials.get_auth_header())
 
         # Get the label ids for each of the labels.
-        mountain_label = task_response.json()['labels'][0]['id']
-        person_label = task_response.json()['labels'][1]['id']
+        label_ids = {label['name']: label['id'] for label in task_response.json()['labels']}
 
         # Define the manual annotations to send to the project.
         annotations = {'version': 0,
-                       'tags': [{'id': 17,
-                                 'frame': 0,
-                                 'label_id': person_label,
-                                 'group': 0,
-                                 'source': 'manual',
-                                 'attributes': []},
-                                {'id': 18,
-                                 'frame': 1,
-                                 'label_id': mountain_label,
-                                 'group': 0,
-                                 'source': 'manual',
-                                 'attributes': []},
-                                {'id': 20,
-                                 'frame': 2,
-                                 'label_id': person_label,
-                                 'group': 0,
-                                 'source': 'manual',
-                                 'attributes': []},
-                                {'id': 21,
-                                 'frame': 3,
-                                 'label_id': mountain_label,
-                                 'group': 0,
-                                 'source': 'manual',
-                                 'attributes': []},
-                                {'id': 22,
-                                 'frame': 4,
-                                 'label_id': mountain_label,
-                                 'group': 0,
-                                 'source': 'manual',
-                                 'attributes': []}],
+                       'tags': [dict(id=annotation_id, frame=frame, label_id=label_ids[label_name], group=0,
+                                     source='manual', attributes=[])
+                                for annotation_id, frame, label_name in CLASSIFICATION_TAGS],
                        'shapes': [],
                        'tracks': []}
 
         # Manually add annotations for each of the images.
-        put_response = requests.put(f'{cvat_project.url}/api/tasks/' + str(main_task.task_id) + '/annotations',
-                                    headers=credentials.get_auth_header(),
-                                    json=annotations)
+        put_response = self.http_session.put(f'{cvat_project.url}/api/tasks/' + str(main_task.task_id) + '/annotations',
+                                             headers=credentials.get_auth_header(),
+                                             json=annotations)
 
         # Create the output annotations table.
         output_annotations = self.cas_connection.CASTable('output_annotations')
+        self.addCleanup(self.cas_connection.droptable, 'output_annotations', quiet=True)
 
         # Call the get_annotations() API.
         cvat_project.get_annotations(image_table_encoded, output_annotations)
 
-        # Delete the CVAT project.
-        cvat_project._delete_project_in_cvat()
+        # Fetch the tables from CAS once for all of the assertions.
+        output_annotations_frame = output_annotations.to_frame()
+        cas_table_encoded_frame = cas_table_encoded.to_frame()
 
         # Assert that the images have been copied over correctly
-        self.assertTrue(np.all(output_annotations.to_frame()['_image_'] == cas_table_encoded.to_frame()['_image_']))
+        self.assertTrue(output_annotations_frame['_image_'].equals(cas_table_encoded_frame['_image_']))
 
         # Assert that the annotations are correct.
-        self.assertEqual(output_annotations.to_frame().iloc[0]['_label_'], 'Person')
-        self.assertEqual(output_annotations.to_frame().iloc[1]['_label_'], 'Mountain')
-        self.assertEqual(output_annotations.to_frame().iloc[2]['_label_'], 'Person')
-        self.assertEqual(output_annotations.to_frame().iloc[3]['_label_'], 'Mountain')
-        self.assertEqual(output_annotations.to_frame().iloc[4]['_label_'], 'Mountain')
+        self.assertListEqual(output_annotations_frame['_label_'].iloc[:5].tolist(),
+                             ['Person', 'Mountain', 'Person', 'Mountain', 'Mountain'])
 
     def test_cvat_project_get_annotation_objectdetection(self):
 
-        # Load the images to post to CVAT.
-        cas_table_encoded = self.cas_connection.CASTable('cas_table_encoded_save_test')
-        self.cas_connection.image.loadimages(path='images',
-                                             labellevels=5,
-                                             casout=cas_table_encoded,
-                                             caslib=self.caslib_name,
-                                             decode=False)
+        # The images to post to CVAT are loaded in setUpClass.
+        cas_table_encoded = self.cas_table_encoded
 
-        project_name = 'ObjectDetection'
+        project_name = self._unique_project_name('ObjectDetection')
         annotation_type = AnnotationType.OBJECT_DETECTION
 
-        # Define the labels for the CVAT project.
-        mountain_label = AnnotationLabel(name='Mountain', color='orange')
-        person_label = AnnotationLabel(name='Person', color='green')
-        labels = [mountain_label, person_label]
-
         # Get authentication information for CVAT.
         credentials = Credentials()
 
@@ -476,202 +543,144 @@ class TestCVATProject(unittest.TestCase):
         # Create the CVAT Project.
         cvat_project = CVATProject(url=TestCVATProject.cvat_url, cas_connection=self.cas_connection,
                                    credentials=credentials, project_name=project_name, annotation_type=annotation_type,
-                                   labels=labels)
+                                   labels=self.labels)
+        self.addCleanup(self._delete_project, cvat_project)
 
         # Post the images to the project.
         cvat_project.post_images(image_table_encoded)
 
-        # Wait before trying to access the project.
-        time.sleep(5)
+        # Wait until CVAT can serve the data of the uploaded task.
+        self._wait_for_task_data(cvat_project)
 
         # Get the task response.
-        tasks = cvat_project.get_tasks()
-        for task in tasks:
-            if task.image_table == image_table_encoded:
-                main_task = task
-        task_response = requests.get(f'{cvat_project.url}/api/tasks/' + str(main_task.task_id),
-                                     headers=cvat_project.credentials.get_auth_header())
+        main_task = next((task for task in cvat_project.get_tasks()
+                          if task.image_table.table.name == image_table_encoded.table.name), None)
+        self.assertIsNotNone(main_task)
+        task_response = self.http_session.get(f'{cvat_project.url}/api/tasks/' + str(main_task.task_id),
+                                              headers=cvat_project.credentials.get_auth_header())
 
         # Get the label ids for each of the labels.
-        mountain_label = task_response.json()['labels'][0]['id']
-        person_label = task_response.json()['labels'][1]['id']
+        label_ids = {label['name']: label['id'] for label in task_response.json()['labels']}
 
         # Define the manual annotations to send to the project.
         annotations = {'version': 0,
                        'tags': [],
-                       'shapes': [{'type': 'rectangle',
-                                   'occluded': False,
-                                   'z_order': 0,
-                                   'rotation': 0.0,
-                                   'points': [275.5446428571413,
-                                              43.85649350649146,
-                                              426.08035714285506,
-                                              197.1292207792194],
-                                   'id': 282,
-                                   'frame': 0,
-                                   'label_id': person_label,
-                                   'group': 0,
-                                   'source': 'manual',
-                                   'attributes': []},
-                                  {'type': 'rectangle',
-                                   'occluded': False,
-                                   'z_order': 0,
-                                   'rotation': 0.0,
-                                   'points': [584.8271103896095,
-                                              26.065909090908463,
-                                              731.2573051948038,
-                                              227.2363636363625],
-                                   'id': 283,
-                                   'frame': 0,
-                                   'label_id': person_label,
-                                   'group': 0,
-                                   'source': 'manual',
-                                   'attributes': []},
-                                  {'type': 'rectangle',
-                                   'occluded': False,
-                                   'z_order': 0,
-                                   'rotation': 0.0,
-                                   'points': [321.93652597402615,
-                                              140.7501623376629,
-                                              446.32938311688304,
-                                              334.2501623376629],
-                                   'id': 284,
-                                   'frame': 1,
-                                   'label_id': person_label,
-                                   'group': 0,
-                                   'source': 'manual',
-                                   'attributes': []},
-                                  {'type': 'rectangle',
-                                   'occluded': False,
-                                   'z_order': 0,
-                                   'rotation': 0.0,
-                                   'points': [385.49659090909154,
-                                              240.6090909090908,
-                                              702.9852272727276,
-                                              306.0863636363629],
-                                   'id': 285,
-                                   'frame': 2,
-                                   'label_id': mountain_label,
-                                   'group': 0,
-                                   'source': 'manual',
-                                   'attributes': []},
-                                  {'type': 'rectangle',
-                                   'occluded': False,
-                                   'z_order': 0,
-                                   'rotation': 0.0,
-                                   'points': [439.77077922078024,
-                                              453.1831168831177,
-                                              558.9915584415594,
-                                              599.2285714285717],
-                                   'id': 286,
-                                   'frame': 3,
-                                   'label_id': person_label,
-                                   'group': 0,
-                                   'source': 'manual',
-                                   'attributes': []},
-                                  {'type': 'rectangle',
-                                   'occluded': False,
-                                   'z_order': 0,
-                                   'rotation': 0.0,
-                                   'points': [1846.5759740259746,
-                                              733.351948051948,
-                                              2016.465584415584,
-                                              933.0467532467537],
-                                   'id': 287,
-                                   'frame': 3,
-                                   'label_id': person_label,
-                                   'group': 0,
-                                   'source': 'manual',
-                                   'attributes': []},
-                                  {'type': 'rectangle',
-                                   'occluded': False,
-                                   'z_order': 0,
-                                   'rotation': 0.0,
-                                   'points': [981.298828125, 893.5068359375, 1656.623046875, 1238.9609375],
-                                   'id': 288,
-                                   'frame': 4,
-                                   'label_id': mountain_label,
-                                   'group': 0,
-                                   'source': 'manual',
-                                   'attributes': []}],
+                       'shapes': [dict(type='rectangle', occluded=False, z_order=0, rotation=0.0, points=points,
+                                       id=annotation_id, frame=frame, label_id=label_ids[label_name], group=0,
+                                       source='manual', attributes=[])
+                                  for annotation_id, frame, label_name, points in OBJECT_DETECTION_SHAPES],
                        'tracks': []}
 
         # Manually add annotations for each of the images.
-        put_response = requests.put(f'{cvat_project.url}/api/tasks/' + str(main_task.task_id) + '/annotations',
-                                    headers=credentials.get_auth_header(),
-                                    json=annotations)
+        put_response = self.http_session.put(f'{cvat_project.url}/api/tasks/' + str(main_task.task_id) + '/annotations',
+                                             headers=credentials.get_auth_header(),
+                                             json=annotations)
 
         # Create the output annotations table.
         output_annotations = self.cas_connection.CASTable('output_annotations')
+        self.addCleanup(self.cas_connection.droptable, 'output_annotations', quiet=True)
 
         # Call the get_annotations() API.
         cvat_project.get_annotations(image_table_encoded, output_annotations)
 
-        # Delete the CVAT project.
-        cvat_project._delete_project_in_cvat()
+        # Fetch the tables from CAS once for all of the assertions.
+        output_annotations_frame = output_annotations.to_frame()
+        cas_table_encoded_frame = cas_table_encoded.to_frame()
 
         # Assert that the images have been copied over correctly
-        self.assertTrue(np.all(output_annotations.to_frame()['_image_'] == cas_table_encoded.to_frame()['_image_']))
-
-        # Assert that the first image's annotations are correct.
-        first_image = output_annotations.to_frame().iloc[0]
-        self.assertEqual(first_image['_Object0_'], 'Person')
-        self.assertEqual(first_image['_Object1_'], 'Person')
-        self.assertEqual(first_image['_nObjects_'], 2)
-        self.assertAlmostEqual(first_image['_Object0_xMin'], 275.544642, 2)
-        self.assertAlmostEqual(first_image['_Object0_yMin'], 43.8564935, 2)
-        self.assertAlmostEqual(first_image['_Object0_xMax'], 426.080357, 2)
-        self.assertAlmostEqual(first_image['_Object0_yMax'], 197.12922, 2)
-        self.assertAlmostEqual(first_image['_Object1_xMin'], 584.82711, 2)
-        self.assertAlmostEqual(first_image['_Object1_yMin'], 26.0659090, 2)
-        self.assertAlmostEqual(first_image['_Object1_xMax'], 731.257305, 2)
-        self.assertAlmostEqual(first_image['_Object1_yMax'], 227.236363, 2)
-
-        # Assert that the second image's annotations are correct.
-        second_image = output_annotations.to_frame().iloc[1]
-        self.assertEqual(second_image['_Object0_'], 'Person')
-        self.assertEqual(second_image['_nObjects_'], 1)
-        self.assertAlmostEqual(second_image['_Object0_xMin'], 321.936526, 2)
-        self.assertAlmostEqual(second_image['_Object0_yMin'], 140.750162, 2)
-        self.assertAlmostEqual(second_image['_Object0_xMax'], 446.329383, 2)
-        self.assertAlmostEqual(second_image['_Object0_yMax'], 334.250162, 2)
-        self.assertTrue(np.isnan(second_image['_Object1_xMin']))
-
-        # Assert that the third image's annotations are correct.
-        third_image = output_annotations.to_frame().iloc[2]
-        self.assertEqual(third_image['_Object0_'], 'Mountain')
-        self.assertEqual(third_image['_nObjects_'], 1)
-        self.assertAlmostEqual(third_image['_Object0_xMin'], 385.496591, 2)
-        self.assertAlmostEqual(third_image['_Object0_yMin'], 240.609091, 2)
-        self.assertAlmostEqual(third_image['_Object0_xMax'], 702.985227, 2)
-        self.assertAlmostEqual(third_image['_Object0_yMax'], 306.086363, 2)
-        self.assertTrue(np.isnan(third_image['_Object1_xMin']))
-
-        # Assert that the fourth image's annotations are correct.
-        fourth_image = output_annotations.to_frame().iloc[3]
-        self.assertEqual(fourth_image['_Object0_'], 'Person')
-        self.assertEqual(fourth_image['_Object1_'], 'Person')
-        self.assertEqual(fourth_image['_nObjects_'], 2)
-        self.assertAlmostEqual(fourth_image['_Object0_xMin'], 439.770779, 2)
-        self.assertAlmostEqual(fourth_image['_Object0_yMin'], 453.183117, 2)
-        self.assertAlmostEqual(fourth_image['_Object0_xMax'], 558.991558, 2)
-        self.assertAlmostEqual(fourth_image['_Object0_yMax'], 599.228571, 2)
-        self.assertAlmostEqual(fourth_image['_Object1_xMin'], 1846.575974, 2)
-        self.assertAlmostEqual(fourth_image['_Object1_yMin'], 733.351948, 2)
-        self.assertAlmostEqual(fourth_image['_Object1_xMax'], 2016.465584, 2)
-        self.assertAlmostEqual(fourth_image['_Object1_yMax'], 933.046753, 2)
-
-        ## Assert that the fifth image's annotations are correct.
-        fifth_image = output_annotations.to_frame().iloc[4]
-        self.assertEqual(fifth_image['_Object0_'], 'Mountain')
-        self.assertEqual(fifth_image['_nObjects_'], 1)
-        self.assertAlmostEqual(fifth_image['_Object0_xMin'], 981.298828, 2)
-        self.assertAlmostEqual(fifth_image['_Object0_yMin'], 893.506836, 2)
-        self.assertAlmostEqual(fifth_image['_Object0_xMax'], 1656.623047, 2)
-        self.assertAlmostEqual(fifth_image['_Object0_yMax'], 1238.960938, 2)
-        self.assertTrue(np.isnan(fifth_image['_Object1_xMin']))
-    
+        self.assertTrue(output_annotations_frame['_image_'].equals(cas_table_encoded_frame['_image_']))
+
+        # Assert that the annotations of each image are correct. The expected labels and bounding boxes
+        # (xMin, yMin, xMax, yMax) of each image are listed in the order of the image objects.
+        expected_annotations = [
+            (['Person', 'Person'], [[275.544642, 43.8564935, 426.080357, 197.12922],
+                                    [584.82711, 26.0659090, 731.257305, 227.236363]]),
+            (['Person'], [[321.936526, 140.750162, 446.329383, 334.250162]]),
+            (['Mountain'], [[385.496591, 240.609091, 702.985227, 306.086363]]),
+            (['Person', 'Person'], [[439.770779, 453.183117, 558.991558, 599.228571],
+                                    [1846.575974, 733.351948, 2016.465584, 933.046753]]),
+            (['Mountain'], [[981.298828, 893.506836, 1656.623047, 1238.960938]])
+        ]
+        for index, (expected_labels, expected_boxes) in enumerate(expected_annotations):
+            with self.subTest(image=index):
+                image = output_annotations_frame.iloc[index]
+                object_count = len(expected_labels)
+                self.assertEqual(image['_nObjects_'], object_count)
+                self.assertListEqual([image[f'_Object{k}_'] for k in range(object_count)], expected_labels)
+                boxes = [[image[f'_Object{k}_{coordinate}'] for coordinate in ('xMin', 'yMin', 'xMax', 'yMax')]
+                         for k in range(object_count)]
+                np.testing.assert_allclose(boxes, expected_boxes, rtol=0, atol=0.005)
+                if object_count == 1:
+                    self.assertTrue(np.isnan(image['_Object1_xMin']))
+
+
+class TestCVATProjectUnit(unittest.TestCase):
+    url = 'http://cvat.example.com'
+
+    # Returns a stand-in for a response from the CVAT server
+    @staticmethod
+    def response(status_code, json=None, text=''):
+        response = Mock(status_code=status_code, reason=status_code.phrase, text=text)
+        response.json.return_value = json
+        return response
+
+    # Create an instance of CVATProject with a token
+    @patch('cvpy.annotation.cvat.CVATProject.requests')
+    def test_cvat_project(self, requests_mock):
+        requests_mock.post.return_value = self.response(HTTPStatus.CREATED, json=dict(id=7))
+
+        labels = [AnnotationLabel(name='Mountain', color='orange'), AnnotationLabel(name='Person', color='green')]
+        credentials = Credentials(token='abc1def2ghi')
+        cvat_project = CVATProject(url=self.url, credentials=credentials, project_name='Test Project',
+                                   annotation_type=AnnotationType.OBJECT_DETECTION, labels=labels)
+
+        self.assertEqual(cvat_project.project_id, 7)
+        requests_mock.post.assert_called_once_with(f'{self.url}/api/projects',
+                                                   headers=credentials.get_auth_header(),
+                                                   json=dict(name='Test Project',
+                                                             labels=[label.as_dict() for label in labels]))
+
+        # Delete the project
+        requests_mock.delete.return_value = self.response(HTTPStatus.NO_CONTENT)
+        cvat_project._delete_project_in_cvat()
+        requests_mock.delete.assert_called_once_with(f'{self.url}/api/projects/7',
+                                                     headers=credentials.get_auth_header())
+
+    # Create an instance of CVATProject with a username and password
+    @patch('cvpy.annotation.cvat.CVATAuthenticator.requests')
+    @patch('cvpy.annotation.cvat.CVATProject.requests')
+    def test_cvat_project_user_password(self, requests_mock, authenticator_requests_mock):
+        authenticator_requests_mock.post.return_value = self.response(HTTPStatus.OK, json=dict(key='abc1def2ghi'))
+        requests_mock.post.return_value = self.response(HTTPStatus.CREATED, json=dict(id=7))
+
+        cvat_project = CVATProject(url=self.url, credentials=Credentials(username='foo', password='bar'),
+                                   project_name='Test Project')
+
+        self.assertEqual(cvat_project.credentials.token, 'abc1def2ghi')
+        self.assertEqual(cvat_project.project_id, 7)
+
+    # Create an instance of CVATProject with invalid CVAT credentials
+    @patch('cvpy.annotation.cvat.CVATAuthenticator.requests')
+    def test_cvat_project_invalid_user_password(self, requests_mock):
+        requests_mock.post.return_value = self.response(
+            HTTPStatus.BAD_REQUEST, text='{"non_field_errors": ["Unable to log in with provided credentials."]}')
+
+        with self.assertRaisesRegex(Exception, 'Unable to log in with provided credentials'):
+            CVATProject(url=self.url, credentials=Credentials(username='foo', password='bar'))
+        self.assertEqual(requests_mock.post.call_args.kwargs['timeout'], CVATAuthenticator.LOGIN_TIMEOUT)
+
+    # Fail to create the project in CVAT
+    @patch('cvpy.annotation.cvat.CVATProject.requests')
+    def test_cvat_project_not_created(self, requests_mock):
+        requests_mock.post.return_value = self.response(HTTPStatus.FORBIDDEN)
+
+        with self.assertRaisesRegex(Exception, 'Unable to create the project in the CVAT server: Forbidden'):
+            CVATProject(url=self.url, credentials=Credentials(token='abc1def2ghi'), project_name='Test Project')
+
+
 if __name__ == '__main__':
+    import xmlrunner
+
     if len(sys.argv) > 1:
         TestCVATProject.cas_host = sys.argv.pop(1)
         TestCVATProject.cas_port = sys.argv.pop(1)
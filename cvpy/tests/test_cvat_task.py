@@ -4,30 +4,63 @@ from http import HTTPStatus
 
 import swat
 import requests
-import xmlrunner
+from requests.adapters import HTTPAdapter
 
 from cvpy.base.ImageTable import ImageTable
 from cvpy.annotation.base.AnnotationLabel import AnnotationLabel
 from cvpy.annotation.base.AnnotationType import AnnotationType
 from cvpy.annotation.base.Credentials import Credentials
+from cvpy.annotation.cvat.CVATAuthenticator import CVATAuthenticator
 from cvpy.annotation.cvat.CVATTask import CVATTask
 from cvpy.annotation.cvat.CVATProject import CVATProject
 
 
 class TestCVATTask(unittest.TestCase):
+    cvat_url = None
+    cas_host = None
+    cas_port = None
+    cvat_username = None
+    cvat_password = None
+    datapath = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # These tests need live CAS and CVAT servers
+        if not TestCVATTask.cas_host or not TestCVATTask.cvat_url:
+            raise unittest.SkipTest('The CAS and CVAT servers are not configured.')
+
+        # Setup CAS connection and CASlib once for all tests
+        cls.cas_connection = swat.CAS(TestCVATTask.cas_host, TestCVATTask.cas_port, protocol='http')
+        # Close the connection even if the rest of the setup fails, as tearDownClass only runs after it succeeds
+        cls.addClassCleanup(cls.cas_connection.close)
+        cls.cas_connection.loadactionset('image')
+        cls.cas_connection.addcaslib(name='dlib',
+                                     activeOnAdd=False,
+                                     path=TestCVATTask.datapath,
+                                     dataSource='PATH',
+                                     subdirectories=True)
+
+        # Labels of the project created by the tests
+        cls.labels = [AnnotationLabel(name='Mountain', color='orange'), AnnotationLabel(name='Person', color='green')]
+
+        # Log in once, so that the projects created by the tests reuse the token instead of logging in again
+        cls.credentials = Credentials(TestCVATTask.cvat_username, TestCVATTask.cvat_password)
+        success, message, response = CVATAuthenticator.authenticate(TestCVATTask.cvat_url, cls.credentials)
+        if not success:
+            raise Exception(message)
+        cls.credentials.token = response.json()['key']
+
+        # Reuse pooled connections for all of the HTTP requests the tests send to CVAT, with the token of the login
+        cls.http_session = requests.Session()
+        cls.addClassCleanup(cls.http_session.close)
+        http_adapter = HTTPAdapter(pool_maxsize=16)
+        cls.http_session.mount('http://', http_adapter)
+        cls.http_session.mount('https://', http_adapter)
+        cls.http_session.headers.update(cls.credentials.get_auth_header())
 
     def setUp(self) -> None:
-        # Setup CAS connection and CASlib
-        self.cas_connection = swat.CAS(TestCVATTask.cas_host, TestCVATTask.cas_port, protocol='http')
-        self.cas_connection.loadactionset('image')
-        self.cas_connection.addcaslib(name='dlib',
-                                      activeOnAdd=False,
-                                      path=TestCVATTask.datapath,
-                                      dataSource='PATH',
-                                      subdirectories=True)
-
         # Load the images in a CAS Table
-        cas_table_encoded = self.cas_connection.CASTable('cas_table_encoded')
+        cas_table_encoded = self.cas_connection.CASTable('cas_table_encoded', replace=True)
         self.cas_connection.image.loadimages(labellevels=5,
                                              casout=cas_table_encoded,
                                              caslib='dlib',
@@ -35,9 +68,6 @@ class TestCVATTask(unittest.TestCase):
 
         self.image_table = ImageTable(cas_table_encoded)
 
-    def tearDown(self) -> None:
-        self.cas_connection.close()
-
     # Create an instance of CVATTask
     def test_cvat_task(self):
 
@@ -47,15 +77,10 @@ class TestCVATTask(unittest.TestCase):
         project_name = 'Test Project'
         annotation_type = AnnotationType.OBJECT_DETECTION
 
-        mountain_label = AnnotationLabel(name='Mountain', color='orange')
-        person_label = AnnotationLabel(name='Person', color='green')
-
-        labels = [mountain_label, person_label]
-
-        credentials = Credentials(self.cvat_username, self.cvat_password)
+        credentials = self.credentials
         cvat_project = CVATProject(url=url, cas_connection=self.cas_connection, credentials=credentials,
                                    project_name=project_name, annotation_type=annotation_type,
-                                   labels=labels)
+                                   labels=self.labels)
 
         # Create the CVATTask object and then the task in CVAT itself.
         cvat_task = CVATTask(self.image_table, cvat_project)
@@ -69,7 +94,7 @@ class TestCVATTask(unittest.TestCase):
         self.assertIsNotNone(cvat_task.task_id)
 
         # Get the general task data and veerify the task was posted to the correct project.
-        response = requests.get(f'{url}/api/tasks/{cvat_task.task_id}', headers=credentials.get_auth_header())
+        response = self.http_session.get(f'{url}/api/tasks/{cvat_task.task_id}')
         self.assertEqual(response.status_code, HTTPStatus.OK)
         self.assertEqual(response.json()['project_id'], cvat_project.project_id)
 
@@ -78,6 +103,8 @@ class TestCVATTask(unittest.TestCase):
 
 
 if __name__ == '__main__':
+    import xmlrunner
+
     if len(sys.argv) > 1:
         TestCVATTask.cvat_url = sys.argv.pop(1)
         TestCVATTask.cas_host = sys.argv.pop(1)
@@ -18,7 +18,6 @@
 
 import os
 import unittest
-import xmlrunner
 import struct
 import swat
 import sys
@@ -27,11 +26,39 @@ from cvpy.utils.ImageUtils import ImageUtils
 from cvpy.base.ImageDataType import ImageDataType
 
 
-def load(self, path):
+# Pixels of the biomedimg/simple.png test image, read-only so that no test changes them
+SIMPLE_IMAGE_ARRAY = np.array([[0, 0, 0, 0, 0], [0, 255, 0, 0, 0], [0, 255, 0, 150, 0], [0, 0, 0, 0, 50], [0, 0, 0, 0, 0]])
+SIMPLE_IMAGE_ARRAY.setflags(write=False)
+
+# Rescale step type for each image data type
+RESCALE_TYPES = {
+    ImageDataType.CV_8UC1.value: 'TO_8U',
+    ImageDataType.CV_8UC3.value: 'TO_8U',
+    ImageDataType.CV_32FC1.value: 'TO_32F',
+    ImageDataType.CV_32FC3.value: 'TO_32F',
+    ImageDataType.CV_64FC1.value: 'TO_64F',
+    ImageDataType.CV_64FC3.value: 'TO_64F'
+}
+
+# Number of channels and numpy data type for each image data type
+DATA_TYPE_SPECS = {
+    ImageDataType.CV_8UC1.value: (1, np.uint8),
+    ImageDataType.CV_8UC3.value: (3, np.uint8),
+    ImageDataType.CV_32FC1.value: (1, np.float32),
+    ImageDataType.CV_32FC3.value: (3, np.float32),
+    ImageDataType.CV_64FC1.value: (1, np.float64),
+    ImageDataType.CV_64FC3.value: (3, np.float64)
+}
+
+# Prefix of a wide image: -1, the width, the height and the image data type as 64-bit integers
+WIDE_PREFIX = struct.Struct('=4q')
+
+
+def load(self, path, name):
     # Load the image
-    image = self.s.CASTable('image', replace=True)
+    image = self.s.CASTable(name, replace=True)
     self.s.image.loadImages(path=path,
-                            casOut=dict(name='image', replace='TRUE'),
+                            casOut=image,
                             addColumns={"WIDTH", "HEIGHT"},
                             caslib='dlib',
                             decode=True)
@@ -41,17 +68,13 @@ def load(self, path):
 def rescale(self, image, rescale_type):
 
     # Determine the desired rescale type
-    if rescale_type == ImageDataType.CV_8UC1.value or rescale_type == ImageDataType.CV_8UC3.value:
-        rescale_params = "TO_8U"
-    elif rescale_type == ImageDataType.CV_32FC1.value or rescale_type == ImageDataType.CV_32FC3.value:
-        rescale_params = "TO_32F"
-    elif rescale_type == ImageDataType.CV_64FC1.value or rescale_type == ImageDataType.CV_64FC3.value:
-        rescale_params = "TO_64F"
-
-    # Rescale the image
+    rescale_params = RESCALE_TYPES[rescale_type]
+
+    # Rescale the image into another table, so that the loaded image can be rescaled again to another type
+    rescaled_image = self.s.CASTable('image', replace=True)
     self.s.image.processimages(
         table=image,
-        casout=image,
+        casout=rescaled_image,
         steps=[
             {
                 'step':
@@ -65,72 +88,105 @@ def rescale(self, image, rescale_type):
         decode=True
     )
 
-    return image
+    return rescaled_image
 
 
 def create_numpy_array_and_wide_image(image, num_channels, data_type):
-    # Get the image data
-    image_rows = image.to_frame()
-    image_binary = image_rows['_image_'][0]
-    width = image_rows['_width_'][0]
-    height = image_rows['_height_'][0]
+    # Get the image data, fetching only the row and the columns that are used
+    image_rows = image.fetch(to=1, fetchvars=['_image_', '_width_', '_height_'], sastypes=False)['Fetch']
+    image_row = image_rows.iloc[0]
+    image_binary = image_row['_image_']
+    width = int(image_row['_width_'])
+    height = int(image_row['_height_'])
 
     # Get the number of channels and the numpy data type
-    if data_type == ImageDataType.CV_8UC1.value:
-        num_channels = 1
-        np_data_type = np.uint8
-    elif data_type == ImageDataType.CV_8UC3.value:
-        num_channels = 3
-        np_data_type = np.uint8
-    elif data_type == ImageDataType.CV_32FC1.value:
-        num_channels = 1
-        np_data_type = np.float32
-    elif data_type == ImageDataType.CV_32FC3.value:
-        num_channels = 3
-        np_data_type = np.float32
-    elif data_type == ImageDataType.CV_64FC1.value:
-        num_channels = 1
-        np_data_type = np.float64
-    elif data_type == ImageDataType.CV_64FC3.value:
-        num_channels = 3
-        np_data_type = np.float64
+    num_channels, np_data_type = DATA_TYPE_SPECS[data_type]
 
     # Create the original numpy image array
-    image_array = np.array(bytearray(image_binary[0:(width * height * num_channels)])).astype(np_data_type)
-    numpy_image_array = np.reshape(image_array, (width, height, num_channels))
+    image_array = np.frombuffer(image_binary, dtype=np_data_type, count=width * height * num_channels)
+    # The image rows are stored one after the other, so the array is indexed by row, then column, then channel
+    numpy_image_array = np.reshape(image_array, (height, width, num_channels))
 
-    # Convert the numpy array to a wide image
-    wide_prefix = np.array([-1, height, width, data_type], dtype=np.int64)
+    # Convert the numpy array to a wide image, writing the prefix and the image data into one preallocated buffer.
+    # The prefix holds the width before the height.
+    wide_image = bytearray(WIDE_PREFIX.size + numpy_image_array.nbytes)
+    WIDE_PREFIX.pack_into(wide_image, 0, -1, width, height, data_type)
+    wide_image[WIDE_PREFIX.size:] = memoryview(numpy_image_array).cast('B')
 
     # Return both the array and the wide image
-    return numpy_image_array, (wide_prefix.tobytes() + numpy_image_array.tobytes())
-
-
-class TestImage(unittest.TestCase):
+    return numpy_image_array, wide_image
 
-    def setUp(self) -> None:
-        # Set up CAS connection
-        self.s = swat.CAS(TestImage.CAS_HOST, TestImage.CAS_PORT, TestImage.USERNAME,
-                     TestImage.PASSWORD)
-        self.s.loadactionset("image")
-        self.s.addcaslib(name='dlib', activeOnAdd=False, path=TestImage.DATAPATH, dataSource='PATH',
-                         subdirectories=True)
 
-    def tearDown(self) -> None:
-        self.s.close()
+# Tests of ImageUtils that do not need a CAS server
+class TestImageUnit(unittest.TestCase):
 
     def test_convert_to_CAS_column(self):
         self.assertTrue(ImageUtils.convert_to_CAS_column("id") == "_id_")
 
-    def test_get_image_array(self):
-        # Load the image
-        self.s.image.loadImages(path='biomedimg/simple.png',
-                                casOut=dict(name='image', replace='TRUE'),
-                                addColumns={"WIDTH", "HEIGHT", "DEPTH", "CHANNELTYPE", "SPACING"},
-                                caslib='dlib',
-                                decode=True)
+    def test_get_image_array_from_row_dtypes(self):
+        width = 2
+
+        # Test all single channel data types, each in its own subtest so that a failure names the data type
+        img_dtypes = ['32S', '32F', '64F', '64U', '16U', '16S', '8U', '8S']
+        np_dtypes = [np.int32, np.float32, np.float64, np.uint64, np.uint16, np.int16, np.uint8, np.int8]
+        for (img_dtype, np_dtype) in zip(img_dtypes, np_dtypes):
+            with self.subTest(img_dtype=img_dtype, channel_count=1):
+                image = np.arange(0,width*width).reshape([width,width]).astype(np_dtype)
+                resolution = image.shape[:2]
+                imageArray = ImageUtils.get_image_array_from_row(image.tobytes(), 2, resolution, img_dtype, 1)
+                self.assertTrue(np.array_equal(image, imageArray))
+                self.assertEqual(imageArray.dtype, np_dtype)
 
-        imageRows = self.s.fetch(table='image', sastypes=False)['Fetch']
+        # Test all multi-channel data types
+        img_dtypes = ['8U', '']
+        np_dtypes = [np.uint8, np.uint8]
+        for (img_dtype, np_dtype) in zip(img_dtypes, np_dtypes):
+            with self.subTest(img_dtype=img_dtype, channel_count=3):
+                image = np.arange(0,width*width*3).reshape([width,width,3]).astype(np_dtype)
+                resolution = image.shape[:2]
+                imageArray = ImageUtils.get_image_array_from_row(image[..., ::-1].tobytes(), 2, resolution, img_dtype, 3)
+                self.assertTrue(np.array_equal(image, imageArray))
+                self.assertEqual(imageArray.dtype, np_dtype)
+
+
+class TestImage(unittest.TestCase):
+    CAS_HOST = None
+    CAS_PORT = None
+    USERNAME = None
+    PASSWORD = None
+    DATAPATH = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # Set up a CAS connection shared by all tests
+        cls.s = swat.CAS(TestImage.CAS_HOST, TestImage.CAS_PORT, TestImage.USERNAME,
+                         TestImage.PASSWORD)
+        cls.s.loadactionset("image")
+        cls.s.loadactionset("biomedimage")
+        cls.s.addcaslib(name='dlib', activeOnAdd=False, path=TestImage.DATAPATH, dataSource='PATH',
+                        subdirectories=True)
+
+        # Load the medical image that the get_image_array tests read, once with all of the columns they need
+        cls.simple_image = cls.s.CASTable('simple_image', replace=True)
+        cls.s.image.loadImages(path='biomedimg/simple.png',
+                               casOut=cls.simple_image,
+                               addColumns={"WIDTH", "HEIGHT", "DEPTH", "CHANNELTYPE", "SPACING"},
+                               caslib='dlib',
+                               decode=True)
+
+        # Fetch its row once, the tests only read it
+        cls.simple_rows = cls.s.fetch(table=cls.simple_image, sastypes=False)['Fetch']
+
+        # Load the color and grayscale images that the wide image tests rescale to each data type
+        cls.color_image = load(cls, 'images/Sas_c.jpg', 'color_image')
+        cls.gray_image = load(cls, 'unittest/gray_3x3.png', 'gray_image')
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.s.close()
+
+    def test_get_image_array(self):
+        imageRows = self.simple_rows
 
         medicalDimensions = imageRows["_dimension_"]
         medicalFormats = imageRows["_channelType_"]
@@ -138,20 +194,10 @@ class TestImage(unittest.TestCase):
         medicalResolutions = imageRows["_resolution_"]
 
         medicalImageArray = ImageUtils.get_image_array(medicalBinaries, medicalDimensions, medicalResolutions, medicalFormats, 0)
-        self.assertTrue(np.array_equal(medicalImageArray, np.array([[0, 0, 0, 0, 0], [0, 255, 0, 0, 0], [0, 255, 0, 150, 0], [0, 0, 0, 0, 50], [0, 0, 0, 0, 0]])))
-
-        # Close the connection
-        self.s.close()
+        self.assertTrue(np.array_equal(medicalImageArray, SIMPLE_IMAGE_ARRAY))
 
     def test_get_image_array_from_row(self):
-        # Load the image
-        self.s.image.loadImages(path='biomedimg/simple.png',
-                                casOut=dict(name='image', replace='TRUE'),
-                                addColumns={"WIDTH", "HEIGHT", "DEPTH", "CHANNELTYPE", "SPACING"},
-                                caslib='dlib',
-                                decode=True)
-
-        imageRows = self.s.fetch(table='image', sastypes=False)['Fetch']
+        imageRows = self.simple_rows
 
         medicalDimensions = imageRows["_dimension_"]
         medicalFormats = imageRows["_channelType_"]
@@ -160,210 +206,55 @@ class TestImage(unittest.TestCase):
 
         n=0
         dimension = int(medicalDimensions[n])
-        resolution = np.array(struct.unpack('=%sq' % dimension, medicalResolutions[n][0:dimension * 8]))
-        resolution = resolution[::-1]
+        resolution = np.frombuffer(medicalResolutions[n], dtype='=i8', count=dimension)[::-1]
         myformat = medicalFormats[n]
         medicalImageArray = ImageUtils.get_image_array_from_row(medicalBinaries[n], dimension, resolution, myformat, 1)
 
-        self.assertTrue(np.array_equal(medicalImageArray, np.array([[0, 0, 0, 0, 0], [0, 255, 0, 0, 0], [0, 255, 0, 150, 0], [0, 0, 0, 0, 50], [0, 0, 0, 0, 0]])))
-
-        # Close the connection
-        self.s.close()
+        self.assertTrue(np.array_equal(medicalImageArray, SIMPLE_IMAGE_ARRAY))
 
-    def test_get_image_array_from_row_dtypes(self):
-        test_pass = True
-        width = 2
-
-        # Test all single channel data types
-        img_dtypes = ['32S', '32F', '64F', '64U', '16U', '16S', '8U', '8S']
-        np_dtypes = [np.int32, np.float32, np.float64, np.uint64, np.uint16, np.int16, np.uint8, np.int8, np.uint8]
-        for (img_dtype, np_dtype) in zip(img_dtypes, np_dtypes):
-            image = np.arange(0,width*width).reshape([width,width]).astype(np_dtype)
-            resolution = image.shape[:2]
-            imageArray = ImageUtils.get_image_array_from_row(bytes(image), 2, resolution, img_dtype, 1)
-            test_pass = test_pass and np.array_equal(image, imageArray)
-            test_pass = test_pass and (imageArray.dtype == np_dtype)
-
-        # Test all multi-channel data types
-        img_dtypes = ['8U', '']
-        np_dtypes = [np.uint8, np.uint8]
-        for (img_dtype, np_dtype) in zip(img_dtypes, np_dtypes):
-            image = np.arange(0,width*width*3).reshape([width,width,3]).astype(np_dtype)
-            resolution = image.shape[:2]
-            imageArray = ImageUtils.get_image_array_from_row(bytes(np.flip(image, 2)), 2, resolution, img_dtype, 3)
-            test_pass = test_pass and np.array_equal(image, imageArray)
-            test_pass = test_pass and (imageArray.dtype == np_dtype)
-
-        self.assertTrue(test_pass)
-    
     def test_get_image_array_const_ctype(self):
-        self.s.loadactionset('biomedimage')
-
-        # Load the image
-        cdata = self.s.CASTable('cdata')
-        self.s.image.loadimages(path='biomedimg/simple.png',
-                                casout=cdata,
-                                caslib='dlib',
-                                decode=True)
-        
-        example_rows = cdata.to_frame()
+        example_rows = self.simple_rows
         medical_dimensions = example_rows['_dimension_']
         medical_binaries = example_rows['_image_']
         medical_resolutions = example_rows['_resolution_']
         
         image_array = ImageUtils.get_image_array_const_ctype(medical_binaries, medical_dimensions, medical_resolutions, ctype='8U', n=0, channel_count=1)
         
-        self.assertTrue(np.array_equal(image_array, np.array([[0, 0, 0, 0, 0],[0, 255, 0, 0, 0],[0, 255, 0, 150, 0],[0, 0, 0, 0, 50],[0, 0, 0, 0, 0]])))
+        self.assertTrue(np.array_equal(image_array, SIMPLE_IMAGE_ARRAY))
 
-        # Close the connection
-        self.s.close()
+    # Test the convert_wide_to_numpy() and convert_numpy_to_wide() functions for each image data type
+    def test_convert_wide_to_numpy(self):
+        data_types = [(self.color_image, ImageDataType.CV_8UC3, 3),
+                      (self.gray_image, ImageDataType.CV_8UC1, 1),
+                      (self.gray_image, ImageDataType.CV_32FC1, 1),
+                      (self.color_image, ImageDataType.CV_32FC3, 3),
+                      (self.gray_image, ImageDataType.CV_64FC1, 1),
+                      (self.color_image, ImageDataType.CV_64FC3, 3)]
+        for (loaded_image, data_type, num_channels) in data_types:
+            with self.subTest(data_type=data_type.name):
+                # Rescale the loaded input image to the desired type
+                image = rescale(self, loaded_image, data_type.value)
 
-    # Test convert_wide_to_numpy() function for a CV_8UC3 image
-    def test_convert_wide_to_numpy_CV_8UC3(self):
-        # Load and rescale the input image to the desired type
-        image = load(self, 'images/Sas_c.jpg')
-        image = rescale(self, image, ImageDataType.CV_8UC3.value)
+                # Use the image data to create the original numpy array and the wide image to be converted
+                (numpy_image_array, wide_byte_buffer) = create_numpy_array_and_wide_image(image, num_channels,
+                                                                                          data_type.value)
 
-        # Use the image data to create the original numpy array and the wide image to be converted
-        (numpy_image_array, wide_byte_buffer) = create_numpy_array_and_wide_image(image, 3, ImageDataType.CV_8UC3.value)
+                # Use the convert_wide_to_numpy() function to convert the wide image back to numpy
+                output_array = ImageUtils.convert_wide_to_numpy(wide_byte_buffer)
 
-        # Use the convert_wide_to_numpy() function to convert the wide image back to numpy
-        output_array = ImageUtils.convert_wide_to_numpy(wide_byte_buffer)
+                # Compare these arrays to make sure they are equal
+                self.assertTrue(np.array_equal(numpy_image_array, output_array))
 
-        # Compare these arrays to make sure they are equal
-        self.assertTrue(np.array_equal(numpy_image_array, output_array))
+                # Use the convert_numpy_to_wide() function to convert the wide image back to numpy
+                output_wide_byte_buffer = ImageUtils.convert_numpy_to_wide(output_array)
 
-        # Use the convert_numpy_to_wide() function to convert the wide image back to numpy
-        output_wide_byte_buffer = ImageUtils.convert_numpy_to_wide(output_array)
-
-        # Compare these buffers to make sure they are equal
-        self.assertTrue(wide_byte_buffer == output_wide_byte_buffer)
-
-        # Close the connection
-        self.s.close()
-
-    # Test convert_wide_to_numpy() function for a CV_8UC1 image
-    def test_convert_wide_to_numpy_CV_8UC1(self):
-        # Load and rescale the input image to the desired type
-        image = load(self, 'unittest/gray_3x3.png')
-        image = rescale(self, image, ImageDataType.CV_8UC1.value)
-
-        # Use the image data to create the original numpy array and the wide image to be converted
-        (numpy_image_array, wide_byte_buffer) = create_numpy_array_and_wide_image(image, 1, ImageDataType.CV_8UC1.value)
-
-        # Use the convert_wide_to_numpy() function to convert the wide image back to numpy
-        output_array = ImageUtils.convert_wide_to_numpy(wide_byte_buffer)
-
-        # Compare these arrays to make sure they are equal
-        self.assertTrue(np.array_equal(numpy_image_array, output_array))
-
-        # Use the convert_numpy_to_wide() function to convert the wide image back to numpy
-        output_wide_byte_buffer = ImageUtils.convert_numpy_to_wide(output_array)
-
-        # Compare these buffers to make sure they are equal
-        self.assertTrue(wide_byte_buffer == output_wide_byte_buffer)
-
-        # Close the connection
-        self.s.close()
-
-    # Test convert_wide_to_numpy() function for a CV_32FC1 image
-    def test_convert_wide_to_numpy_CV_32FC1(self):
-        # Load and rescale the input image to the desired type
-        image = load(self, 'unittest/gray_3x3.png')
-        image = rescale(self, image, ImageDataType.CV_32FC1.value)
-
-        # Use the image data to create the original numpy array and the wide image to be converted
-        (numpy_image_array, wide_byte_buffer) = create_numpy_array_and_wide_image(image, 1, ImageDataType.CV_32FC1.value)
-
-        # Use the convert_wide_to_numpy() function to convert the wide image back to numpy
-        output_array = ImageUtils.convert_wide_to_numpy(wide_byte_buffer)
-
-        # Compare these arrays to make sure they are equal
-        self.assertTrue(np.array_equal(numpy_image_array, output_array))
-
-        # Use the convert_numpy_to_wide() function to convert the wide image back to numpy
-        output_wide_byte_buffer = ImageUtils.convert_numpy_to_wide(output_array)
-
-        # Compare these buffers to make sure they are equal
-        self.assertTrue(wide_byte_buffer == output_wide_byte_buffer)
-
-        # Close the connection
-        self.s.close()
-
-    # Test convert_wide_to_numpy() function for a CV_32FC3 image
-    def test_convert_wide_to_numpy_CV_32FC3(self):
-        # Load and rescale the input image to the desired type
-        image = load(self, 'images/Sas_c.jpg')
-        image = rescale(self, image, ImageDataType.CV_32FC3.value)
-
-        # Use the image data to create the original numpy array and the wide image to be converted
-        (numpy_image_array, wide_byte_buffer) = create_numpy_array_and_wide_image(image, 3, ImageDataType.CV_32FC3.value)
-
-        # Use the convert_wide_to_numpy() function to convert the wide image back to numpy
-        output_array = ImageUtils.convert_wide_to_numpy(wide_byte_buffer)
-
-        # Compare these arrays to make sure they are equal
-        self.assertTrue(np.array_equal(numpy_image_array, output_array))
-
-        # Use the convert_numpy_to_wide() function to convert the wide image back to numpy
-        output_wide_byte_buffer = ImageUtils.convert_numpy_to_wide(output_array)
-
-        # Compare these buffers to make sure they are equal
-        self.assertTrue(wide_byte_buffer == output_wide_byte_buffer)
-
-        # Close the connection
-        self.s.close()
-
-    # Test convert_wide_to_numpy() function for a CV_64FC1 image
-    def test_convert_wide_to_numpy_CV_64FC1(self):
-        # Load and rescale the input image to the desired type
-        image = load(self, 'unittest/gray_3x3.png')
-        image = rescale(self, image, ImageDataType.CV_64FC1.value)
-
-        # Use the image data to create the original numpy array and the wide image to be converted
-        (numpy_image_array, wide_byte_buffer) = create_numpy_array_and_wide_image(image, 1, ImageDataType.CV_64FC1.value)
-
-        # Use the convert_wide_to_numpy() function to convert the wide image back to numpy
-        output_array = ImageUtils.convert_wide_to_numpy(wide_byte_buffer)
-
-        # Compare these arrays to make sure they are equal
-        self.assertTrue(np.array_equal(numpy_image_array, output_array))
-
-        # Use the convert_numpy_to_wide() function to convert the wide image back to numpy
-        output_wide_byte_buffer = ImageUtils.convert_numpy_to_wide(output_array)
-
-        # Compare these buffers to make sure they are equal
-        self.assertTrue(wide_byte_buffer == output_wide_byte_buffer)
-
-        # Close the connection
-        self.s.close()
-
-    # Test convert_wide_to_numpy() function for a CV_64FC3 image
-    def test_convert_wide_to_numpy_CV_64FC3(self):
-        # Load and rescale the input image to the desired type
-        image = load(self, 'images/Sas_c.jpg')
-        image = rescale(self, image, ImageDataType.CV_64FC3.value)
-
-        # Use the image data to create the original numpy array and the wide image to be converted
-        (numpy_image_array, wide_byte_buffer) = create_numpy_array_and_wide_image(image, 3, ImageDataType.CV_64FC3.value)
-
-        # Use the convert_wide_to_numpy() function to convert the wide image back to numpy
-        output_array = ImageUtils.convert_wide_to_numpy(wide_byte_buffer)
-
-        # Compare these arrays to make sure they are equal
-        self.assertTrue(np.array_equal(numpy_image_array, output_array))
-
-        # Use the convert_numpy_to_wide() function to convert the wide image back to numpy
-        output_wide_byte_buffer = ImageUtils.convert_numpy_to_wide(output_array)
-
-        # Compare these buffers to make sure they are equal
-        self.assertTrue(wide_byte_buffer == output_wide_byte_buffer)
-
-        # Close the connection
-        self.s.close()
+                # Compare these buffers to make sure they are equal
+                self.assertTrue(wide_byte_buffer == output_wide_byte_buffer)
 
 
 if __name__ == '__main__':
+    import xmlrunner
+
     if len(sys.argv) > 1:
         TestImage.DATAPATH = sys.argv.pop()
         TestImage.PASSWORD = sys.argv.pop()
@@ -19,7 +19,6 @@
 import sys
 import unittest
 
-import xmlrunner
 from swat import CAS
 
 from cvpy.base.ImageTable import ImageTable
@@ -383,6 +382,8 @@ class TestImageTable(unittest.TestCase):
 
 
 if __name__ == '__main__':
+    import xmlrunner
+
     if len(sys.argv) > 1:
         TestImageTable.CAS_HOST = sys.argv.pop(1)
         TestImageTable.CAS_PORT = sys.argv.pop(1)
@@ -21,11 +21,29 @@ import unittest
 
 import numpy as np
 import swat
-import xmlrunner
 
 from cvpy.base.ImageTable import ImageTable
 
 
+# Pixels of the masked TestMasking/simple_natural_image.png test image, read-only so that no test changes them
+MASKED_SIMPLE_IMAGE_ARRAY = np.array([
+    [0, 0, 0, 0, 0],
+    [0, 0, 0, 0, 0],
+    [0, 0, 0, 0, 0],
+    [0, 0, 64, 32, 0],
+    [0, 0, 75, 210, 0]
+])
+MASKED_SIMPLE_IMAGE_ARRAY.setflags(write=False)
+
+# Pixels of the masked imagetypes/gray_3x3.png test image
+MASKED_GRAY_IMAGE_ARRAY = np.array([
+    [0, 0, 255],
+    [0, 255, 255],
+    [0, 128, 0]
+])
+MASKED_GRAY_IMAGE_ARRAY.setflags(write=False)
+
+
 def load(self, path):
     # Load the image
     image = self.s.CASTable('image', replace=True)
@@ -38,17 +56,30 @@ def load(self, path):
 
 
 class TestImage(unittest.TestCase):
-
-    def setUp(self) -> None:
-        # Set up CAS connection
-        self.s = swat.CAS(TestImage.CAS_HOST, TestImage.CAS_PORT, TestImage.USERNAME,
-                          TestImage.PASSWORD, protocol=TestImage.CAS_PROTOCOL)
-        self.s.loadactionset("image")
-        self.s.addcaslib(name='dlib', activeOnAdd=False, path=TestImage.DATAPATH, dataSource='PATH',
-                         subdirectories=True)
-
-    def tearDown(self) -> None:
-        self.s.close()
+    CAS_HOST = None
+    CAS_PORT = None
+    CAS_PROTOCOL = None
+    USERNAME = None
+    PASSWORD = None
+    DATAPATH = None
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        # Set up CAS connection and load the action set once for all tests
+        cls.s = swat.CAS(TestImage.CAS_HOST, TestImage.CAS_PORT, TestImage.USERNAME,
+                         TestImage.PASSWORD, protocol=TestImage.CAS_PROTOCOL)
+        cls.s.loadactionset("image")
+        cls.s.addcaslib(name='dlib', activeOnAdd=False, path=TestImage.DATAPATH, dataSource='PATH',
+                        subdirectories=True)
+
+        # Load the decoded mask that the grayscale masking tests share, masking only reads it
+        cls.gray_mask = ImageTable.load(cls.s, path="imagetypes/gray_2_3x3.png",
+                                        load_parms={'caslib': 'dlib', 'decode': True},
+                                        output_table_parms={'replace': True})
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.s.close()
 
     def test_mask_encoded_image_encoded_mask(self):
         # Load the image
@@ -74,37 +105,19 @@ class TestImage(unittest.TestCase):
         # Masking
         new_img = image_table.mask_image(smask, decode=False)
 
-        test_arr = np.asarray([
-            [0, 0, 0, 0, 0],
-            [0, 0, 0, 0, 0],
-            [0, 0, 0, 0, 0],
-            [0, 0, 64, 32, 0],
-            [0, 0, 75, 210, 0]
-        ])
-
         new_img_arr = np.asarray(self.s.image.fetchImages(table=new_img.table).Images.Image[0])
-        self.assertTrue(np.array_equal(new_img_arr, test_arr))
+        self.assertTrue(np.array_equal(new_img_arr, MASKED_SIMPLE_IMAGE_ARRAY))
 
     def test_mask_decoded_image_decoded_mask(self):
         # Load the image
         img = ImageTable.load(self.s, path="imagetypes/gray_3x3.png", load_parms={'caslib': 'dlib', 'decode': True},
                               output_table_parms={'replace': True})
 
-        # Load the mask image
-        smask = ImageTable.load(self.s, path="imagetypes/gray_2_3x3.png", load_parms={'caslib': 'dlib', 'decode': True},
-                                output_table_parms={'replace': True})
-
-        # Masking
-        new_img = img.mask_image(smask, decode=False)
-
-        test_arr = np.array(
-            [[0, 0, 255],
-             [0, 255, 255],
-             [0, 128, 0]]
-        )
+        # Masking with the decoded mask image
+        new_img = img.mask_image(self.gray_mask, decode=False)
 
         new_img_arr = np.asarray(self.s.image.fetchImages(table=new_img.table).Images.Image[0])
-        self.assertTrue(np.array_equal(new_img_arr, test_arr))
+        self.assertTrue(np.array_equal(new_img_arr, MASKED_GRAY_IMAGE_ARRAY))
 
     def test_mask_decoded_image_encoded_mask(self):
         # Load the image
@@ -132,40 +145,24 @@ class TestImage(unittest.TestCase):
         # Masking
         new_img = img.mask_image(smask, decode=False)
 
-        test_arr = np.asarray([
-            [0, 0, 0, 0, 0],
-            [0, 0, 0, 0, 0],
-            [0, 0, 0, 0, 0],
-            [0, 0, 64, 32, 0],
-            [0, 0, 75, 210, 0]
-        ])
-
         new_img_arr = np.asarray(self.s.image.fetchImages(table=new_img.table).Images.Image[0])
-        self.assertTrue(np.array_equal(new_img_arr, test_arr))
+        self.assertTrue(np.array_equal(new_img_arr, MASKED_SIMPLE_IMAGE_ARRAY))
 
     def test_mask_encoded_image_decoded_mask(self):
         # Load the image
         img = ImageTable.load(self.s, path="imagetypes/gray_3x3.png", load_parms={'caslib': 'dlib', 'decode': False},
                               output_table_parms={'replace': True})
 
-        # Load the mask image
-        smask = ImageTable.load(self.s, path="imagetypes/gray_2_3x3.png", load_parms={'caslib': 'dlib', 'decode': True},
-                                output_table_parms={'replace': True})
-
-        # Masking
-        new_img = img.mask_image(smask, decode=False)
-
-        test_arr = np.array(
-            [[0, 0, 255],
-             [0, 255, 255],
-             [0, 128, 0]]
-        )
+        # Masking with the decoded mask image
+        new_img = img.mask_image(self.gray_mask, decode=False)
 
         new_img_arr = np.asarray(self.s.image.fetchImages(table=new_img.table).Images.Image[0])
-        self.assertTrue(np.array_equal(new_img_arr, test_arr))
+        self.assertTrue(np.array_equal(new_img_arr, MASKED_GRAY_IMAGE_ARRAY))
 
 
 if __name__ == '__main__':
+    import xmlrunner
+
     if len(sys.argv) > 1:
         TestImage.DATAPATH = sys.argv.pop()
         TestImage.PASSWORD = sys.argv.pop()
@@ -18,15 +18,23 @@
 
 ''' CAS thread optimization tool '''
 
-from typing import Callable
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Tuple
 import numpy as np
 
 from swat.cas import CAS
 
 from cvpy.base.CASServerMode import CASServerMode
+from cvpy.base.SearchStrategy import SearchStrategy
 from cvpy.base.Statistic import Statistic
 from cvpy.base.CASThreadTunerResults import CASThreadTunerResults
 
+# Two-sided 95% critical values of the t distribution for 1 to 30 degrees of freedom
+T_CRITICAL_VALUES = (12.706, 4.303, 3.182, 2.776, 2.571, 2.447, 2.365, 2.306, 2.262, 2.228,
+                     2.201, 2.179, 2.160, 2.145, 2.131, 2.120, 2.110, 2.101, 2.093, 2.086,
+                     2.080, 2.074, 2.069, 2.064, 2.060, 2.056, 2.052, 2.048, 2.045, 2.042)
+
 
 class CASThreadTuner(object):
 
@@ -37,7 +45,12 @@ class CASThreadTuner(object):
                           iterations: int = 5,
                           controller_thread_range: range = range(4, 65, 4),
                           worker_thread_range: range = range(4, 65, 4),
-                          objective_measure: Statistic = Statistic.MEAN) -> CASThreadTunerResults:
+                          objective_measure: Statistic = Statistic.MEAN,
+                          search_strategy: SearchStrategy = SearchStrategy.GRID,
+                          early_stopping: bool = False,
+                          max_workers: int = 1,
+                          sample_count: int = 16,
+                          seed: int = None) -> CASThreadTunerResults:
         '''
         Compute the optimal thread count for a given image action.
 
@@ -57,6 +70,26 @@ class CASThreadTuner(object):
             Specifies the range of threads on each worker node.
         objective_measure : :class:'enum.EnumMeta'
             Specifies the objective measure for performance over the given iterations - mean, median, minimum, maximum, stdev.
+        search_strategy : :class:'enum.EnumMeta'
+            Specifies how the combinations of threads are explored - grid evaluates every combination, pattern
+            evaluates only the combinations visited by a pattern search towards the optimum, latin hypercube
+            evaluates a Latin hypercube sample of sample_count combinations. The statistics of combinations that
+            are not evaluated are NaN.
+        early_stopping : :class:'bool'
+            Specifies whether to stop the iterations for a combination of threads once the 95% confidence interval
+            of its mean execution time lies above the confidence interval of the best combination so far.
+        max_workers : :class:'int'
+            Specifies the number of combinations of threads to measure concurrently. Each worker thread calls
+            setup_function for its own session and teardown_function at the end, so when max_workers is greater
+            than one, setup_function must return a distinct session on every call, otherwise an exception is
+            raised. The concurrent combinations share the CAS server, so their execution times are skewed compared
+            to measuring them one at a time.
+        sample_count : :class:'int'
+            Specifies the number of combinations of threads in the sample of the latin hypercube search strategy.
+        seed : :class:'int'
+            Specifies the seed of the random number generator of the latin hypercube search strategy, so that the
+            same combinations of threads are sampled on every run. A different sample is drawn on every run when
+            the seed is None.
 
         Returns
         -------
@@ -64,61 +97,113 @@ class CASThreadTuner(object):
 
         '''
 
+        if iterations < 1:
+            raise Exception(f'iterations must be at least 1, got {iterations}.')
+        if search_strategy == SearchStrategy.LATIN_HYPERCUBE and sample_count < 1:
+            raise Exception(f'sample_count must be at least 1, got {sample_count}.')
+
         # Setup function
         s = setup_function()
 
-        # SMP
+        # SMP uses the same thread count on the controller and the workers
         if s.serverstatus()['server']['nodes'].values[0] == 1:
             mode = CASServerMode.SMP
+            grid_shape = (len(controller_thread_range),)
+        else:
+            mode = CASServerMode.MPP
+            grid_shape = (len(controller_thread_range), len(worker_thread_range))
+
+        # perf_array stores the performance statistic
+        perf_array = np.full((len(Statistic),) + grid_shape, np.nan)
+        iteration_counts = np.zeros(grid_shape, dtype=int)
+
+        # Upper bound of the confidence interval of the best combination so far
+        best_upper_bound = np.inf
+
+        # Guards the best upper bound and the session list when combinations are measured concurrently
+        lock = threading.Lock()
 
-            # Loop over controller thread range
-            perf_array = np.zeros((len(Statistic), len(controller_thread_range)))
-            for c_thread_idx, c_thread_count in enumerate(controller_thread_range):
+        def measure(session: CAS, index: Tuple[int, ...]) -> float:
+            nonlocal best_upper_bound
+            c_thread_count = controller_thread_range[index[0]]
+            w_thread_count = c_thread_count if mode == CASServerMode.SMP else worker_thread_range[index[1]]
 
-                perf_record = np.zeros(iterations)
-                # Loop over given number of iterations
-                for iteration in range(iterations):
-                    perf = action_function(s, c_thread_count, c_thread_count)
-                    perf_record[iteration] = perf
+            perf_record = np.zeros(iterations)
+            # Snapshot of the best upper bound, which other worker threads may update concurrently
+            with lock:
+                upper_bound = best_upper_bound
+            # Running mean and sum of squared deviations (Welford) of the recorded times
+            count, mean, m2 = 0, 0.0, 0.0
+            # Loop over given number of iterations
+            for iteration in range(iterations):
+                perf = action_function(session, c_thread_count, w_thread_count)
+                perf_record[iteration] = perf
 
-                # perf_array stores the performance statistic
-                perf_array[Statistic.MEAN.value, c_thread_idx] = round(float(np.mean(perf_record)), 4)
-                perf_array[Statistic.MEDIAN.value, c_thread_idx] = round(float(np.median(perf_record)), 4)
-                perf_array[Statistic.MINIMUM.value, c_thread_idx] = round(float(np.amin(perf_record)), 4)
-                perf_array[Statistic.MAXIMUM.value, c_thread_idx] = round(float(np.amax(perf_record)), 4)
-                perf_array[Statistic.STDEV.value, c_thread_idx] = round(float(np.std(perf_record)), 4)
+                count += 1
+                delta = perf - mean
+                mean += delta / count
+                m2 += delta * (perf - mean)
 
+                # Stop once this combination is clearly slower than the best one
+                if early_stopping and count > 1 and \
+                        mean - CASThreadTuner._confidence_half_width(count, m2) > upper_bound:
+                    break
+
+            if count > 1:
+                with lock:
+                    best_upper_bound = min(best_upper_bound, mean + CASThreadTuner._confidence_half_width(count, m2))
+
+            iteration_counts[index] = count
+            perf_array[(slice(None),) + index] = CASThreadTuner._compute_statistics(perf_record[:count])
+            return perf_array[(objective_measure.value,) + index]
+
+        executor = None
+        worker_sessions = []
+        if max_workers > 1:
+            # Each worker thread measures on its own session
+            executor = ThreadPoolExecutor(max_workers=max_workers)
+            thread_data = threading.local()
+
+            def measure_in_worker(index: Tuple[int, ...]) -> float:
+                if not hasattr(thread_data, 'session'):
+                    session = setup_function()
+                    with lock:
+                        # Concurrent actions on one session would interfere, so every session must be distinct
+                        if any(session is other for other in [s] + worker_sessions):
+                            raise Exception('setup_function must return a distinct session on every call when '
+                                            'max_workers is greater than 1.')
+                        worker_sessions.append(session)
+                    thread_data.session = session
+                return measure(thread_data.session, index)
+
+            def evaluate(indices: List[Tuple[int, ...]]) -> List[float]:
+                return list(executor.map(measure_in_worker, indices))
         else:
-            mode = CASServerMode.MPP
+            def evaluate(indices: List[Tuple[int, ...]]) -> List[float]:
+                return [measure(s, index) for index in indices]
 
-            # Loop over controller thread range
-            perf_array = np.zeros((len(Statistic), len(controller_thread_range), len(worker_thread_range)))
-            for c_thread_idx, c_thread_count in enumerate(controller_thread_range):
-
-                # Loop over worker thread range
-                for w_thread_idx, w_thread_count in enumerate(worker_thread_range):
-
-                    perf_record = np.zeros(iterations)
-                    # Loop over given number of iterations
-                    for iteration in range(iterations):
-                        perf = action_function(s, c_thread_count, w_thread_count)
-                        perf_record[iteration] = perf
-
-                    # perf_array stores the performance statistic
-                    perf_array[Statistic.MEAN.value, c_thread_idx, w_thread_idx] = round(float(np.mean(perf_record)), 4)
-                    perf_array[Statistic.MEDIAN.value, c_thread_idx, w_thread_idx] = round(
-                        float(np.median(perf_record)), 4)
-                    perf_array[Statistic.MINIMUM.value, c_thread_idx, w_thread_idx] = round(float(np.amin(perf_record)),
-                                                                                            4)
-                    perf_array[Statistic.MAXIMUM.value, c_thread_idx, w_thread_idx] = round(float(np.amax(perf_record)),
-                                                                                            4)
-                    perf_array[Statistic.STDEV.value, c_thread_idx, w_thread_idx] = round(float(np.std(perf_record)), 4)
+        try:
+            if search_strategy == SearchStrategy.PATTERN:
+                CASThreadTuner._pattern_search(evaluate, grid_shape)
+            elif search_strategy == SearchStrategy.LATIN_HYPERCUBE:
+                evaluate(CASThreadTuner._latin_hypercube_sample(grid_shape, sample_count, seed))
+            else:
+                indices = list(np.ndindex(grid_shape))
+                if max_workers > 1:
+                    # Order the grid so that concurrent combinations use different controller thread counts
+                    indices.sort(key=lambda index: index[::-1])
+                evaluate(indices)
+        finally:
+            if executor is not None:
+                executor.shutdown()
+                for worker_session in worker_sessions:
+                    teardown_function(worker_session)
 
         # Teardown function
         teardown_function(s)
 
         opt_array = perf_array[objective_measure.value]
-        opt_index = np.unravel_index(np.argmin(opt_array, axis=None), opt_array.shape)
+        opt_index = np.unravel_index(np.nanargmin(opt_array, axis=None), opt_array.shape)
 
         worker_optimal_count = None
         if mode == CASServerMode.MPP:
@@ -135,5 +220,85 @@ class CASThreadTuner(object):
                                      median_exec_times=perf_array[Statistic.MEDIAN.value],
                                      minimum_exec_times=perf_array[Statistic.MINIMUM.value],
                                      maximum_exec_times=perf_array[Statistic.MAXIMUM.value],
-                                     stdev_exec_times=perf_array[Statistic.STDEV.value]
+                                     stdev_exec_times=perf_array[Statistic.STDEV.value],
+                                     iteration_counts=iteration_counts
                                      )
+
+    # Returns the performance statistics of a record, ordered by the values of Statistic
+    @staticmethod
+    def _compute_statistics(perf_record: np.ndarray) -> List[float]:
+        statistics = [0.0] * len(Statistic)
+        statistics[Statistic.MEAN.value] = round(float(np.mean(perf_record)), 4)
+        statistics[Statistic.MEDIAN.value] = round(float(CASThreadTuner._median(perf_record)), 4)
+        statistics[Statistic.MINIMUM.value] = round(float(np.amin(perf_record)), 4)
+        statistics[Statistic.MAXIMUM.value] = round(float(np.amax(perf_record)), 4)
+        statistics[Statistic.STDEV.value] = round(float(np.std(perf_record)), 4)
+        return statistics
+
+    # Returns the median of the values, selecting the middle elements with a partition instead of a full sort
+    @staticmethod
+    def _median(values: np.ndarray) -> float:
+        middle = len(values) // 2
+        if len(values) % 2:
+            return np.partition(values, middle)[middle]
+        partitioned = np.partition(values, (middle - 1, middle))
+        return (partitioned[middle - 1] + partitioned[middle]) / 2
+
+    # Returns the half width of the 95% confidence interval of the mean of count samples, given the sum of squared
+    # deviations from their mean
+    @staticmethod
+    def _confidence_half_width(count: int, m2: float) -> float:
+        degrees_of_freedom = count - 1
+        if degrees_of_freedom <= len(T_CRITICAL_VALUES):
+            t_critical_value = T_CRITICAL_VALUES[degrees_of_freedom - 1]
+        else:
+            t_critical_value = 1.96
+        return t_critical_value * np.sqrt(m2 / degrees_of_freedom / count)
+
+    # Returns a Latin hypercube sample of the indices of the thread grid. Each axis is split into sample_count strata
+    # and every stratum of every axis is sampled exactly once. Indices that are sampled more than once, which happens
+    # when an axis has fewer thread counts than sample_count, are only returned once. The sample is reproducible
+    # for a given seed.
+    @staticmethod
+    def _latin_hypercube_sample(grid_shape: Tuple[int, ...], sample_count: int,
+                                seed: int = None) -> List[Tuple[int, ...]]:
+        rng = np.random.default_rng(seed)
+        axis_indices = []
+        for size in grid_shape:
+            strata = (rng.permutation(sample_count) + rng.random(sample_count)) / sample_count
+            axis_indices.append((strata * size).astype(int).tolist())
+        return list(dict.fromkeys(zip(*axis_indices)))
+
+    # Pattern search over the indices of the thread grid. The search starts at the center of the grid and moves to
+    # the best of the neighbors at the current step size along each axis. When no neighbor improves the objective,
+    # the step size is halved, and the search stops once no neighbor at step size one improves the objective.
+    @staticmethod
+    def _pattern_search(evaluate: Callable[[List[Tuple[int, ...]]], List[float]],
+                        grid_shape: Tuple[int, ...]) -> None:
+        objective_values = dict()
+
+        current = tuple(size // 2 for size in grid_shape)
+        objective_values[current] = evaluate([current])[0]
+        steps = [max(size // 4, 1) for size in grid_shape]
+
+        while True:
+            # Neighbors of the current index that are inside the grid
+            neighbors = []
+            for axis, step in enumerate(steps):
+                for offset in (-step, step):
+                    neighbor = list(current)
+                    neighbor[axis] += offset
+                    if 0 <= neighbor[axis] < grid_shape[axis]:
+                        neighbors.append(tuple(neighbor))
+
+            # Evaluate the neighbors that have not been visited yet
+            unvisited = [neighbor for neighbor in dict.fromkeys(neighbors) if neighbor not in objective_values]
+            objective_values.update(zip(unvisited, evaluate(unvisited)))
+
+            best = min(neighbors, key=objective_values.get, default=None)
+            if best is not None and objective_values[best] < objective_values[current]:
+                current = best
+            elif max(steps) > 1:
+                steps = [max(step // 2, 1) for step in steps]
+            else:
+                break
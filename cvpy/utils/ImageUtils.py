@@ -209,10 +209,8 @@ class ImageUtils(object):
 
         """
 
-        # Get the width and height from the input buffer
-        width = np.frombuffer(wide_image[8:2 * 8], dtype=np.int64)[0]
-        height = np.frombuffer(wide_image[2 * 8:3 * 8], dtype=np.int64)[0]
-        data_type = np.frombuffer(wide_image[3 * 8:4 * 8], dtype=np.int64)[0]
+        # Get the width and height from the input buffer, reading it in place instead of slicing it
+        (_, width, height, data_type) = np.frombuffer(wide_image, dtype=np.int64, count=4)
 
         # Get the number of channels and the numpy data type
         if data_type == ImageDataType.CV_8UC1.value:
@@ -234,8 +232,8 @@ class ImageUtils(object):
             num_channels = 3
             np_data_type = np.float64
 
-        # Return the numpy array
-        return np.frombuffer(wide_image[4 * 8:], dtype=np_data_type).reshape(height, width, num_channels)
+        # Return the numpy array, copied so that it does not share memory with the wide image
+        return np.frombuffer(wide_image, dtype=np_data_type, offset=4 * 8).reshape(height, width, num_channels).copy()
 
     @staticmethod
     def convert_numpy_to_wide(numpy_array: np.ndarray) -> bytes:
@@ -49,6 +49,9 @@ setup(
         'mayavi', 
         'requests'
     ],
+    extras_require={
+        'test': ['pytest', 'pytest-xdist', 'unittest-xml-reporting']
+    },
     classifiers=[
         'Development Status :: 5 - Production/Stable',
         'Environment :: Console',